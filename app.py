@@ -3,15 +3,41 @@
 # ======================================================
 
 import os
+import gzip
 import json
+import tempfile
+from functools import lru_cache, partial
 from io import BytesIO
 from datetime import datetime
 from flask import (
     Flask, render_template, jsonify, request,
-    send_file
+    send_file, g, url_for
+)
+from knowledge_base import KB
+from http_cache import kb_conditional
+from programmes import PROGRAMMES, UnknownProgramme
+from assessment_tables import assessments_by_profile
+from evidence_index import PROFILE_EVIDENCE
+from generation_context import meta_data, profile_context, context_stats
+from streaming import stream_format, stream_records, stream_written
+from result_store import RESULTS
+from generation_cache import GENERATION_CACHE, generation_response
+from utils import CLOInputError, field, memo, result_records
+from coverage import compute_coverage, coverage_payload, write_coverage_workbook
+from course_export import (
+    CLO_TABLE_HEADER, ExportError, export_items, clo_rows, resolved_clos, write_course_workbook
+)
+from course_pack import write_course_pack
+from rubrics import (
+    RUBRIC_HEADER, RUBRICS_HEADER, rubric_rows, rubric_table_rows,
+    write_rubric_workbook, write_rubrics_workbook
+)
+from export_formats import ExportFormatError, export_format, download_format, table_response
+from jobs import JOBS, JobError, JobQueueFull, job_download, job_file, job_payload
+from course_matrix import (
+    UploadError, iter_upload_rows, spool_upload, closing_rows,
+    generate_matrix, write_matrix_workbook
 )
-import pandas as pd
-from openpyxl import Workbook, load_workbook
 
 # ------------------------------------------------------
 # App setup
@@ -24,451 +50,85 @@ app = Flask(
     template_folder=os.path.join(BASE_DIR, "templates")
 )
 
-WORKBOOK_PATH = os.path.join(BASE_DIR, "SCLOG (1).xlsx")
-FRONT_JSON = os.path.join(app.static_folder, "data", "SCLOG_front.json")
-
-
 # ------------------------------------------------------
-# Safe JSON loader
-# ------------------------------------------------------
-def safe_load_json(path):
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-MAP = safe_load_json(FRONT_JSON)
-
-DEFAULT_KEYS = {
-    "IEGs": [], "PEOs": [], "PLOs": [],
-    "IEGtoPEO": {}, "PEOtoPLO": {},
-    "PLOstatements": {}, "PEOstatements": {},
-    "PLOtoVBE": {}, "PLOIndicators": {},
-    "SCmapping": {}
-}
-for k, v in DEFAULT_KEYS.items():
-    MAP.setdefault(k, v)
-
-
-# ------------------------------------------------------
-# Excel helpers
+# Excel helpers (served from the shared knowledge-base snapshot)
 # ------------------------------------------------------
 def load_df(sheet_name):
-    if not os.path.exists(WORKBOOK_PATH):
-        return pd.DataFrame()
-    try:
-        return pd.read_excel(WORKBOOK_PATH, sheet_name=sheet_name, engine="openpyxl")
-    except:
-        return pd.DataFrame()
-
-
-PROFILE_SHEET_MAP = {
-    "health": "Mapping_health",
-    "sc": "Mapping_sc",
-    "eng": "Mapping_eng",
-    "socs": "Mapping_socs",
-    "edu": "Mapping_edu",
-    "bus": "Mapping_bus",
-    "arts": "Mapping_arts"
-}
+    return KB.load_df(sheet_name)
+
 
 def get_mapping_sheet(profile):
-    sheet = PROFILE_SHEET_MAP.get(profile, "Mapping")
-    df = load_df(sheet)
-    if df.empty:
-        df = load_df("Mapping")
-    return df
+    # resolved once per workbook version — a missing profile sheet goes
+    # straight to "Mapping" without a second lookup
+    return load_df(KB.mapping_sheet(profile))
 
 
 def get_plo_details(plo, profile="sc"):
-    df = get_mapping_sheet(profile)
-    if df.empty:
-        return None
-
-    df.columns = [str(c).strip() for c in df.columns]
-    col_plo = df.columns[0]
-    mask = df[col_plo].astype(str).str.upper() == str(plo).upper()
-
-    if not mask.any():
-        return None
-
-    row = df[mask].iloc[0]
-    return {
-        "SC_Code": row.get("SC Code", row.get("SCCode", "")),
-        "SC_Desc": row.get("SC Description", row.get("SCDescription", "")),
-        "VBE": row.get("VBE", ""),
-        "Domain": row.get("Domain", "")
-    }
-
-
-# ------------------------------------------------------
-# META (Criterion + Condition)
-# ------------------------------------------------------
-def get_meta_data(plo, bloom, profile="sc"):
-    details = get_plo_details(plo, profile)
-    if not details:
-        return {}
-
-    domain = (details.get("Domain") or "").lower()
-    criterion = ""
-    condition = ""
-
-    df = load_df("Criterion")
-    if not df.empty:
-        df.columns = [c.strip() for c in df.columns]
-
-        left = df.iloc[:,0].astype(str).str.lower()
-        right = df.iloc[:,1].astype(str).str.lower()
-
-        mask = (left == domain) & (right == str(bloom).lower())
-        if mask.any():
-            row = df[mask].iloc[0]
-            if len(row) > 2:
-                criterion = str(row.iloc[2])
-            if len(row) > 3:
-                condition = str(row.iloc[3])
-
-    if not condition:
-        defaults = {
-            "cognitive": "interpreting tasks",
-            "affective": "engaging with peers",
-            "psychomotor": "performing skills"
-        }
-        condition = defaults.get(domain, "")
-
-    connector = "by" if domain == "psychomotor" else "when"
-    cond_final = f"{connector} {condition}"
-
-    return {
-        "sc_code": details["SC_Code"],
-        "sc_desc": details["SC_Desc"],
-        "vbe": details["VBE"],
-        "domain": domain,
-        "criterion": criterion,
-        "condition": cond_final
-    }
+    return KB.plo_details(plo, profile)
 
 
 # ------------------------------------------------------
-# Assessment / Evidence
+# Mapping JSON (part of the snapshot — reloads with it)
 # ------------------------------------------------------
-def get_assessment(plo, bloom, domain, profile):
-    b = bloom.lower().strip()
-    d = domain.lower().strip()
-    p = profile.strip().lower()
-
-    # ===============================
-    # COGNITIVE — BY PROFILE
-    # ===============================
-    cognitive = {
-
-        "medical & health": {
-            "remember": ["MCQ", "Quiz", "Recall questions"],
-            "understand": ["Short answer", "Concept explanation"],
-            "apply": ["Case-based discussion", "Short case", "Screening task"],
-            "analyze": ["Case analysis", "Journal critique"],
-            "analyse": ["Case analysis", "Journal critique"],
-            "evaluate": ["Long case", "Viva Voce", "Clinical decision justification"],
-            "create": ["Clinical management plan", "Health intervention proposal"]
-        },
-
-        "computer science & it": {
-            "remember": ["MCQ", "Quiz"],
-            "understand": ["Short answer", "Code explanation"],
-            "apply": ["Programming assignment", "Coding exercise"],
-            "analyze": ["Code analysis", "Debugging task"],
-            "analyse": ["Code analysis", "Debugging task"],
-            "evaluate": ["Code review", "System evaluation report"],
-            "create": ["Software project", "Capstone project"]
-        },
-
-        "engineering & technology": {
-            "remember": ["Test", "Quiz"],
-            "understand": ["Technical explanation"],
-            "apply": ["Problem-solving assignment", "Design exercise"],
-            "analyze": ["System analysis", "Technical report"],
-            "analyse": ["System analysis", "Technical report"],
-            "evaluate": ["Design evaluation", "Oral presentation"],
-            "create": ["Design project", "Capstone project"]
-        },
-
-        "social sciences": {
-            "remember": ["Test", "Reading quiz"],
-            "understand": ["Essay", "Discussion"],
-            "apply": ["Case study", "Fieldwork report"],
-            "analyze": ["Thematic analysis", "Policy analysis"],
-            "analyse": ["Thematic analysis", "Policy analysis"],
-            "evaluate": ["Critical review", "Oral presentation"],
-            "create": ["Research project", "Policy proposal"]
-        },
-
-        "education": {
-            "remember": ["Test", "Quiz"],
-            "understand": ["Essay", "Reflection"],
-            "apply": ["Lesson plan", "Microteaching"],
-            "analyze": ["Teaching reflection report"],
-            "analyse": ["Teaching reflection report"],
-            "evaluate": ["Teaching evaluation", "Portfolio review"],
-            "create": ["Curriculum design project", "Action research"]
-        },
-
-        "business & management": {
-            "remember": ["Test", "Quiz"],
-            "understand": ["Essay", "Case discussion"],
-            "apply": ["Business case study", "Problem-solving assignment"],
-            "analyze": ["Financial analysis", "Market analysis"],
-            "analyse": ["Financial analysis", "Market analysis"],
-            "evaluate": ["Strategy evaluation", "Oral presentation"],
-            "create": ["Business plan", "Consultancy project"]
-        },
-
-        "arts & humanities": {
-            "remember": ["Quiz", "Visual identification"],
-            "understand": ["Essay", "Artwork interpretation"],
-            "apply": ["Studio exercise", "Creative task"],
-            "analyze": ["Artwork analysis", "Critical review"],
-            "analyse": ["Artwork analysis", "Critical review"],
-            "evaluate": ["Portfolio critique", "Oral presentation"],
-            "create": ["Creative project", "Final portfolio"]
-        }
-    }
+def get_map():
+    return KB.front_map()
 
-    # ===============================
-    # AFFECTIVE — BY PROFILE
-    # ===============================
-    affective = {
-
-        "medical & health": {
-            "receive": ["Professional awareness reflection"],
-            "respond": ["Ward / clinical participation"],
-            "value": ["Ethics & patient safety reflection"],
-            "organization": ["Interprofessional teamwork portfolio"],
-            "characterization": ["Clinical professionalism assessment"]
-        },
 
-        "computer science & it": {
-            "receive": ["Learning reflection"],
-            "respond": ["Participation in technical discussions"],
-            "value": ["Ethics in computing essay"],
-            "organization": ["Team-based software project portfolio"],
-            "characterization": ["Professional conduct in computing"]
-        },
+def programme_map():
+    # ?programme=<id> selects a registry mapping; none → SCLOG_front.json
+    return PROGRAMMES.get(request.args.get("programme")).front
 
-        "engineering & technology": {
-            "receive": ["Safety awareness reflection"],
-            "respond": ["Lab participation"],
-            "value": ["Engineering ethics reflection"],
-            "organization": ["Project team portfolio"],
-            "characterization": ["Professional engineering behaviour"]
-        },
 
-        "social sciences": {
-            "receive": ["Social awareness reflection"],
-            "respond": ["Seminar participation"],
-            "value": ["Ethical reasoning essay"],
-            "organization": ["Group research portfolio"],
-            "characterization": ["Professional social conduct"]
-        },
+def programme_version():
+    return (PROGRAMMES.get(request.args.get("programme")).version,)
 
-        "education": {
-            "receive": ["Teaching values reflection"],
-            "respond": ["Classroom participation"],
-            "value": ["Ethics in education essay"],
-            "organization": ["Teaching portfolio"],
-            "characterization": ["Teacher professionalism assessment"]
-        },
 
-        "business & management": {
-            "receive": ["Business awareness reflection"],
-            "respond": ["Case discussion participation"],
-            "value": ["Business ethics essay"],
-            "organization": ["Team consultancy portfolio"],
-            "characterization": ["Professional business conduct"]
-        },
+@app.errorhandler(UnknownProgramme)
+def unknown_programme(e):
+    return jsonify({"error": f"Unknown programme '{e.args[0]}'"}), 404
 
-        "arts & humanities": {
-            "receive": ["Creative awareness reflection"],
-            "respond": ["Studio participation"],
-            "value": ["Artistic values reflection"],
-            "organization": ["Creative portfolio"],
-            "characterization": ["Professional artistic practice"]
-        }
-    }
 
-    # ===============================
-    # PSYCHOMOTOR — BY PROFILE
-    # ===============================
-    psychomotor = {
-
-        "medical & health": {
-            "perception": ["Recognition of clinical signs"],
-            "set": ["Clinical preparation checklist"],
-            "guided response": ["Supervised clinical task"],
-            "mechanism": ["Clinical skills test", "OSCE"],
-            "complex overt response": ["OSCE", "Clinical simulation"],
-            "adaptation": ["Management of complex patients"],
-            "origination": ["Independent patient management"]
-        },
+# ------------------------------------------------------
+# Snapshot watcher + version headers
+# ------------------------------------------------------
+@app.before_request
+def pin_knowledge_base():
+    KB.start_watcher()
+    g.kb_token = KB.pin()
 
-        "computer science & it": {
-            "perception": ["Recognition of system requirements"],
-            "set": ["Development environment setup"],
-            "guided response": ["Guided coding task"],
-            "mechanism": ["Hands-on coding test"],
-            "complex overt response": ["System simulation"],
-            "adaptation": ["Code optimisation task"],
-            "origination": ["Independent software development"]
-        },
 
-        "engineering & technology": {
-            "perception": ["Identification of system components"],
-            "set": ["Lab setup checklist"],
-            "guided response": ["Guided laboratory task"],
-            "mechanism": ["Laboratory practical"],
-            "complex overt response": ["Integrated lab assessment"],
-            "adaptation": ["System troubleshooting"],
-            "origination": ["Independent engineering task"]
-        },
+@app.after_request
+def knowledge_base_headers(response):
+    snap = KB.snapshot()
+    response.headers["X-KB-Version"] = snap.version
+    response.headers["X-KB-Loaded-At"] = datetime.fromtimestamp(snap.loaded_at).isoformat(timespec="seconds")
+    return response
 
-        "social sciences": {
-            "perception": ["Observation of social phenomena"],
-            "set": ["Fieldwork preparation"],
-            "guided response": ["Guided data collection"],
-            "mechanism": ["Fieldwork practical"],
-            "complex overt response": ["Community-based simulation"],
-            "adaptation": ["Contextual analysis task"],
-            "origination": ["Independent field study"]
-        },
 
-        "education": {
-            "perception": ["Classroom observation"],
-            "set": ["Lesson preparation"],
-            "guided response": ["Guided teaching practice"],
-            "mechanism": ["Microteaching practical"],
-            "complex overt response": ["Teaching simulation"],
-            "adaptation": ["Adaptive teaching task"],
-            "origination": ["Independent teaching session"]
-        },
+@app.teardown_request
+def unpin_knowledge_base(exc):
+    token = g.pop("kb_token", None)
+    if token is not None:
+        KB.unpin(token)
 
-        "business & management": {
-            "perception": ["Observation of business processes"],
-            "set": ["Business case preparation"],
-            "guided response": ["Guided business simulation"],
-            "mechanism": ["Business skills practical"],
-            "complex overt response": ["Management simulation"],
-            "adaptation": ["Strategic adjustment task"],
-            "origination": ["Independent consultancy task"]
-        },
 
-        "arts & humanities": {
-            "perception": ["Observation of artistic techniques"],
-            "set": ["Studio preparation"],
-            "guided response": ["Guided studio task"],
-            "mechanism": ["Studio practical"],
-            "complex overt response": ["Performance / exhibition simulation"],
-            "adaptation": ["Creative adaptation task"],
-            "origination": ["Independent creative production"]
-        }
-    }
+# ------------------------------------------------------
+# META (Criterion + Condition)
+# ------------------------------------------------------
+def get_meta_data(plo, bloom, profile="sc"):
+    return meta_data(KB.snapshot(), plo, bloom, profile)
 
-    if d == "cognitive":
-        return cognitive.get(p, {}).get(b, [])
-    if d == "affective":
-        return affective.get(p, {}).get(b, [])
-    if d == "psychomotor":
-        return psychomotor.get(p, {}).get(b, [])
 
-    return []
+# ------------------------------------------------------
+# Assessment / Evidence
+# ------------------------------------------------------
+def get_assessment(plo, bloom, domain, profile):
+    # tables live in assessment_tables (frozen once, lookups memoised)
+    return assessments_by_profile(domain, profile, bloom)
 
 def get_evidence_for(assessment):
-    a = assessment.lower().strip()
-
-    mapping = {
-
-        # TEST / QUIZ
-        "mcq": ["Score report"],
-        "quiz": ["Quiz score"],
-        "test": ["Test score report"],
-        "recall": ["Marked answer script"],
-
-        # WRITTEN / ESSAY
-        "short answer": ["Marked answer script"],
-        "essay": ["Written essay"],
-        "concept explanation": ["Written explanation"],
-        "code explanation": ["Annotated code explanation"],
-        "technical explanation": ["Written technical explanation"],
-
-        # CASE / DISCUSSION
-        "case-based discussion": ["CbD record", "Supervisor feedback"],
-        "short case": ["Short case assessment form"],
-        "long case": ["Long case report", "Examiner evaluation form"],
-        "case study": ["Case study report"],
-        "case analysis": ["Case analysis worksheet"],
-        "discussion": ["Discussion participation record"],
-        "journal critique": ["Journal critique report"],
-
-        # CLINICAL / PRACTICAL
-        "screening": ["Screening checklist"],
-        "skills test": ["Skills checklist"],
-        "osce": ["OSCE score sheet"],
-        "simulation": ["Simulation checklist"],
-        "observation": ["Observation checklist"],
-        "guided task": ["Supervisor observation form"],
-
-        # PROGRAMMING / IT
-        "programming assignment": ["Source code submission", "Grading rubric"],
-        "coding exercise": ["Code submission"],
-        "debugging": ["Debugging report"],
-        "code analysis": ["Code review report"],
-        "code review": ["Code review rubric"],
-
-        # ENGINEERING / DESIGN
-        "design exercise": ["Design documentation"],
-        "design project": ["Project report", "Design artefact"],
-        "system analysis": ["System analysis report"],
-        "technical report": ["Technical report"],
-
-        # EDUCATION
-        "lesson plan": ["Lesson plan document"],
-        "microteaching": ["Teaching observation rubric"],
-        "teaching evaluation": ["Teaching evaluation form"],
-        "portfolio review": ["Portfolio evidence"],
-
-        # BUSINESS / SOCIAL SCIENCE
-        "financial analysis": ["Financial analysis report"],
-        "market analysis": ["Market analysis report"],
-        "policy analysis": ["Policy analysis report"],
-        "fieldwork": ["Fieldwork report"],
-        "consultancy": ["Consultancy report"],
-
-        # PROJECT / RESEARCH / CREATIVE
-        "project": ["Project documentation"],
-        "capstone": ["Capstone project report"],
-        "research": ["Research report"],
-        "proposal": ["Proposal document"],
-        "business plan": ["Business plan document"],
-        "creative project": ["Creative artefact", "Project reflection"],
-        "portfolio": ["Portfolio evidence"],
-
-        # AFFECTIVE / PROFESSIONAL
-        "reflection": ["Reflection journal"],
-        "participation": ["Participation record"],
-        "peer feedback": ["Peer feedback form"],
-        "professional": ["Professional behaviour evaluation"],
-        "ethics": ["Ethics reflection"],
-        "presentation": ["Presentation rubric"]
-    }
-
-    evidence = []
-    for key, items in mapping.items():
-        if key in a:
-            evidence.extend(items)
-
-    evidence = list(dict.fromkeys(evidence))
-    return evidence if evidence else ["Assessment evidence"]
+    # precomputed for known assessment names, one keyword pass otherwise
+    return PROFILE_EVIDENCE.evidence_for(assessment)
 
 # ------------------------------------------------------
 # CONTENT suggestions
@@ -500,64 +160,100 @@ def api_content(field):
 # MAPPING endpoints (IEG → PEO → PLO)
 # ------------------------------------------------------
 @app.route("/api/mapping")
+@kb_conditional(parts=programme_version)
 def api_mapping():
-    return jsonify(MAP)
+    return jsonify(programme_map())
 
 @app.route("/api/get_peos/<ieg>")
+@kb_conditional(parts=programme_version)
 def api_get_peos(ieg):
-    return jsonify(MAP["IEGtoPEO"].get(ieg, []))
+    return jsonify(programme_map()["IEGtoPEO"].get(ieg, []))
 
 @app.route("/api/get_plos/<peo>")
+@kb_conditional(parts=programme_version)
 def api_get_plos(peo):
-    return jsonify(MAP["PEOtoPLO"].get(peo, []))
+    return jsonify(programme_map()["PEOtoPLO"].get(peo, []))
+
+
+@app.route("/api/programmes")
+def api_programmes():
+    return jsonify({
+        "available": PROGRAMMES.available(),
+        "registry": PROGRAMMES.stats()
+    })
 
 
 # ------------------------------------------------------
-# LOGIC explanations
+# REVERSE MAPPING (PLO → PEO → IEG)
 # ------------------------------------------------------
-@app.route("/api/logic/ieg_peo/<ieg>")
-def logic_ieg_peo(ieg):
-    explanation = {
-        "IEG1": "IEG1 focuses on knowledge & critical thinking. PEO1 operationalises these outcomes.",
-        "IEG2": "IEG2 emphasises ethics & professionalism. PEO2 aligns with these values.",
-        "IEG3": "IEG3 promotes socio-entrepreneurship. PEO3 guides this development.",
-        "IEG4": "IEG4 strengthens communication. PEO4 builds communication competence.",
-        "IEG5": "IEG5 focuses on leadership & lifelong learning. PEO5 supports these traits."
-    }
-    return explanation.get(ieg, "No logic found."), 200, {"Content-Type": "text/plain"}
+@app.route("/api/reverse/plo/<plo>")
+@kb_conditional()
+def api_reverse_plo(plo):
+    return jsonify({
+        "plo": plo,
+        "peos": KB.plo_peos(plo),
+        "iegs": KB.plo_iegs(plo)
+    })
 
-@app.route("/api/logic/peo_plo/<peo>/<plo>")
-def logic_peo_plo(peo, plo):
-    logic_map = {
-        "PEO1": {
-            "PLO1": "Disciplinary knowledge forms the foundation of professional competence.",
-            "PLO2": "Cognitive and analytical skills enable critical thinking and problem solving.",
-            "PLO3": "Practical and technical skills support professional practice.",
-            "PLO6": "Systems and holistic thinking enhance informed professional decision-making.",
-            "PLO7": "Digital skills support problem-solving in contemporary professional contexts."
-        },
 
-        "PEO2": {
-            "PLO4": "Interpersonal and teamwork skills enable effective collaboration with stakeholders.",
-            "PLO5": "Communication skills support clear and responsible professional interaction."
-        },
+@app.route("/api/reverse/peo/<peo>")
+@kb_conditional()
+def api_reverse_peo(peo):
+    return jsonify({
+        "peo": peo,
+        "iegs": KB.peo_iegs(peo)
+    })
 
-        "PEO3": {
-            "PLO8": "Leadership and responsibility support autonomy in professional contexts.",
-            "PLO9": "Personal and professional development promotes lifelong learning."
-        },
 
-        "PEO4": {
-            "PLO10": "Entrepreneurial and innovative skills enable value creation and innovation."
-        },
+# ------------------------------------------------------
+# LOGIC explanations
+# ------------------------------------------------------
+IEG_PEO_LOGIC = {
+    "IEG1": "IEG1 focuses on knowledge & critical thinking. PEO1 operationalises these outcomes.",
+    "IEG2": "IEG2 emphasises ethics & professionalism. PEO2 aligns with these values.",
+    "IEG3": "IEG3 promotes socio-entrepreneurship. PEO3 guides this development.",
+    "IEG4": "IEG4 strengthens communication. PEO4 builds communication competence.",
+    "IEG5": "IEG5 focuses on leadership & lifelong learning. PEO5 supports these traits."
+}
 
-        "PEO5": {
-            "PLO11": "Ethics and professional conduct ensure responsible and ethical practice."
-        }
+PEO_PLO_LOGIC = {
+    "PEO1": {
+        "PLO1": "Disciplinary knowledge forms the foundation of professional competence.",
+        "PLO2": "Cognitive and analytical skills enable critical thinking and problem solving.",
+        "PLO3": "Practical and technical skills support professional practice.",
+        "PLO6": "Systems and holistic thinking enhance informed professional decision-making.",
+        "PLO7": "Digital skills support problem-solving in contemporary professional contexts."
+    },
+
+    "PEO2": {
+        "PLO4": "Interpersonal and teamwork skills enable effective collaboration with stakeholders.",
+        "PLO5": "Communication skills support clear and responsible professional interaction."
+    },
+
+    "PEO3": {
+        "PLO8": "Leadership and responsibility support autonomy in professional contexts.",
+        "PLO9": "Personal and professional development promotes lifelong learning."
+    },
+
+    "PEO4": {
+        "PLO10": "Entrepreneurial and innovative skills enable value creation and innovation."
+    },
+
+    "PEO5": {
+        "PLO11": "Ethics and professional conduct ensure responsible and ethical practice."
     }
+}
+
+@app.route("/api/logic/ieg_peo/<ieg>")
+@kb_conditional()
+def logic_ieg_peo(ieg):
+    return IEG_PEO_LOGIC.get(ieg, "No logic found."), 200, {"Content-Type": "text/plain"}
 
+@app.route("/api/logic/peo_plo/<peo>/<plo>")
+@kb_conditional()
+def logic_peo_plo(peo, plo):
     return (
-        logic_map.get(peo, {}).get(plo, "No logic available."),
+        PEO_PLO_LOGIC.get(peo, {}).get(plo, "No logic available."),
         200,
         {"Content-Type": "text/plain"}
     )
@@ -566,6 +262,7 @@ def logic_peo_plo(peo, plo):
 # BLOOM & VERB endpoints (Excel)
 # ------------------------------------------------------
 @app.route("/api/get_blooms/<plo>")
+@kb_conditional()
 def api_get_blooms(plo):
     profile = request.args.get("profile", "sc").lower()
 
@@ -575,33 +272,8 @@ def api_get_blooms(plo):
 
     domain = str(details.get("Domain", "")).strip().lower()
 
-    sheet_map = {
-        "cognitive": "Bloom_Cognitive",
-        "affective": "Bloom_Affective",
-        "psychomotor": "Bloom_Psychomotor"
-    }
-
-    sheet = sheet_map.get(domain)
-    if not sheet:
-        return jsonify([])
-
-    df = load_df(sheet)
-    if df.empty:
-        return jsonify([])
-
-    # ✅ BACA MENGGUNAKAN NAMA COLUMN SEBENAR EXCEL
-    if "Bloom Level" not in df.columns:
-        return jsonify([])
-
-    blooms = (
-        df["Bloom Level"]
-        .dropna()
-        .astype(str)
-        .str.strip()
-        .tolist()
-    )
-
-    return jsonify(blooms)
+    # ✅ BACA MENGGUNAKAN NAMA COLUMN SEBENAR EXCEL ("Bloom Level")
+    return jsonify(KB.bloom_levels(domain))
 
 
 
@@ -610,32 +282,17 @@ def api_get_blooms(plo):
 # GET VERBS (BY BLOOM ONLY) — NEW
 # ------------------------------------------------------
 @app.route("/api/get_verbs/<bloom>")
+@kb_conditional()
 def api_get_verbs_by_bloom(bloom):
-    bloom_key = bloom.strip().lower()
-
     # Try all Bloom sheets (Bloom taxonomy is domain-based)
-    for sheet in ["Bloom_Cognitive", "Bloom_Affective", "Bloom_Psychomotor"]:
-        df = load_df(sheet)
-        if df.empty:
-            continue
-
-        if "Bloom Level" not in df.columns:
-            continue
-
-        mask = df["Bloom Level"].astype(str).str.lower() == bloom_key
-        if mask.any():
-            # Column 2 = verbs (based on your Excel)
-            raw = df.loc[mask].iloc[0, 1]
-            verbs = [v.strip() for v in str(raw).split(",") if v.strip()]
-            return jsonify(verbs)
-
-    return jsonify([])
+    return jsonify(KB.bloom_verbs(bloom))
 
 
 # ------------------------------------------------------
 # META endpoint
 # ------------------------------------------------------
 @app.route("/api/get_meta/<plo>/<bloom>")
+@kb_conditional()
 def api_get_meta(plo, bloom):
     profile = request.args.get("profile","sc").lower()
     return jsonify(get_meta_data(plo, bloom, profile))
@@ -645,85 +302,150 @@ def api_get_meta(plo, bloom):
 # STATEMENT endpoint
 # ------------------------------------------------------
 @app.route("/api/get_statement/<level>/<stype>/<code>")
+@kb_conditional(parts=programme_version)
 def api_get_statement(level, stype, code):
     if stype == "PEO":
-        return jsonify(MAP["PEOstatements"].get(level, {}).get(code, ""))
+        return jsonify(programme_map()["PEOstatements"].get(level, {}).get(code, ""))
     if stype == "PLO":
-        return jsonify(MAP["PLOstatements"].get(level, {}).get(code, ""))
+        return jsonify(programme_map()["PLOstatements"].get(level, {}).get(code, ""))
     return jsonify("")
 
 # ------------------------------------------------------
-# GLOBAL STATE
+# BOOTSTRAP — everything generator.html reads, in one response
 # ------------------------------------------------------
-LAST_CLO = {}
+def bootstrap_payload(profile, level, programme):
+    snap = KB.snapshot()
+    front = programme.front
+
+    index = snap.plo_index.get(snap.mapping_sheet(profile), {})
+    plos = list(front.get("PLOs") or [])
+    plos.extend(p for p in programme.graph["PLOtoPEO"] if p not in plos)
+
+    blooms, meta, verbs = {}, {}, {}
+    for plo in plos:
+        details = index.get(str(plo).upper())
+        domain = str(details.get("Domain", "")).strip().lower() if details else ""
+        blooms[plo] = KB.bloom_levels(domain) if details else []
+        # "" → the PLO before a Bloom level is picked
+        meta[plo] = {b: get_meta_data(plo, b, profile) for b in [""] + blooms[plo]}
+        for bloom in blooms[plo]:
+            if bloom not in verbs:
+                verbs[bloom] = KB.bloom_verbs(bloom)
+
+    return {
+        "version": snap.version,
+        "programme": programme.programme,
+        "profile": profile,
+        "level": level,
+        "mapping": front,
+        "statements": {
+            "PEO": front["PEOstatements"].get(level, {}),
+            "PLO": front["PLOstatements"].get(level, {})
+        },
+        "blooms": blooms,
+        "verbs": verbs,
+        "meta": meta,
+        "content": CONTENT_SUGGESTIONS,
+        "logic": {"ieg_peo": IEG_PEO_LOGIC, "peo_plo": PEO_PLO_LOGIC}
+    }
+
+
+@lru_cache(maxsize=64)
+def bootstrap_body(kb_version, programme_version, profile, level, programme_id):
+    # versions are part of the key, so a reload or an edited programme
+    # file never serves a stale body; → (json bytes, gzip bytes)
+    programme = PROGRAMMES.get(programme_id)
+    body = app.json.dumps(bootstrap_payload(profile, level, programme)).encode("utf-8")
+    return body, gzip.compress(body, 6)
+
+
+def bootstrap_args():
+    return (
+        request.args.get("profile", "sc").strip().lower(),
+        request.args.get("level", "Degree").strip(),
+        request.args.get("programme", "").strip()
+    )
+
+
+def bootstrap_parts():
+    # the gzip and identity bodies are different bytes → different ETags
+    return programme_version() + ("gzip" in request.accept_encodings,)
+
+
+@app.route("/api/bootstrap")
+@kb_conditional(parts=bootstrap_parts, vary=("Accept-Encoding",))
+def api_bootstrap():
+    profile, level, programme_id = bootstrap_args()
+    body, compressed = bootstrap_body(
+        KB.snapshot().version, PROGRAMMES.get(programme_id).version,
+        profile, level, programme_id
+    )
+
+    response = app.response_class(mimetype="application/json")
+    if "gzip" in request.accept_encodings:
+        response.set_data(compressed)
+        response.headers["Content-Encoding"] = "gzip"
+    else:
+        response.set_data(body)
+    return response
 
 
 # ------------------------------------------------------
-# GENERATE CLO
+# CLO CONSTRUCTION (shared by /generate and the batch API)
 # ------------------------------------------------------
-@app.route("/generate", methods=["POST"])
-def generate():
-    global LAST_CLO
+BATCH_MAX_ROWS = int(os.environ.get("SCLOG_BATCH_MAX_ROWS", "1000"))
+
 
+def build_clo(fields, cache=None, enforce_bloom_limit=False, programme=None):
+    # `programme`: the request's programmes.ProgrammeMapping (IEG, PEO and
+    # statements); None → the knowledge base's own mapping
     # ==============================
-    # PROFILE (DUA VERSI)
+    # PROFILE
     # ==============================
-    raw_profile = request.form.get("profile", "health").strip().lower()
-
-    # ✅ UNTUK EXCEL (KEKAL)
-    profile_excel = raw_profile   # health, sc, eng
-
-    # ✅ UNTUK ASSESSMENT SAHAJA
-    PROFILE_ASSESSMENT = {
-        "health": "medical & health",
-        "sc": "computer science & it",
-        "eng": "engineering & technology",
-        "socs": "social sciences",
-        "edu": "education",
-        "bus": "business & management",
-        "arts": "arts & humanities"
-    }
-    profile_assessment = PROFILE_ASSESSMENT.get(raw_profile, raw_profile)
-    
+    profile_excel = field(fields, "profile", "health").strip().lower()   # health, sc, eng
 
     # ----------------------------------
     # CONTINUE NORMAL FLOW
     # ----------------------------------
-    plo = request.form.get("plo", "")
-    bloom = request.form.get("bloom", "")
-    verb = request.form.get("verb", "")
+    plo = field(fields, "plo")
+    bloom = field(fields, "bloom")
+    verb = field(fields, "verb")
     if not verb:
         verb = bloom.lower()   # fallback: remember, analyze, etc.
-    content = request.form.get("content", "")
-    level = request.form.get("level", "Degree")
-    programme_name = request.form.get("programmeName", "")
-    ieg_input = request.form.get("ieg", "").strip()
-    course_name = request.form.get("courseName", "")
-    peo_statement = request.form.get("peo_statement", "").strip()
-    plo_indicator = request.form.get("plo_indicator", "").strip()
+    content = field(fields, "content")
+    level = field(fields, "level", "Degree")
+    programme_name = field(fields, "programmeName")
+    ieg_input = field(fields, "ieg").strip()
+    course_name = field(fields, "courseName")
+    peo_statement = field(fields, "peo_statement").strip()
+    plo_indicator = field(fields, "plo_indicator").strip()
 
     # ✅ REQUIRED FIELD CHECK
     if not plo or not bloom or not content:
-        return jsonify({"error": "Missing required fields"}), 400
-
-    details = get_plo_details(plo, profile_excel)
-    meta = get_meta_data(plo, bloom, profile_excel)
-
-    domain = details["Domain"].lower()
-    sc_desc = details["SC_Desc"]
-    vbe = details["VBE"]
+        raise CLOInputError("Missing required fields")
+
+    # SC / VBE / condition / assessments / PEO… are precomputed per
+    # (profile, PLO, bloom, level) and programme — only the sentence is
+    # built here (a batch shares one programme, so it is not in the memo key)
+    ctx = memo(cache, ("context", profile_excel, plo, bloom, level),
+               profile_context, profile_excel, plo, bloom, level, programme)
+    if ctx is None:
+        raise CLOInputError(f"Invalid PLO '{plo}' for profile '{profile_excel}'")
+
+    # DEGREE × BLOOM ENFORCEMENT (batch rows)
+    if enforce_bloom_limit and bloom.lower() not in ctx.allowed:
+        raise CLOInputError(
+            f"Bloom '{bloom}' not allowed for {level} ({ctx.domain.lower()})", list(ctx.allowed)
+        )
 
     # Clean verb duplication
     words = content.strip().split()
     if words and words[0].lower() == verb.lower():
         content = " ".join(words[1:])
 
-    connector = "when" if domain != "psychomotor" else "by"
-    condition_clean = meta["condition"].replace("when ", "").replace("by ", "")
-
     clo = (
-        f"{verb.lower()} {content} using {sc_desc.lower()} "
-        f"{connector} {condition_clean} guided by {vbe.lower()}."
+        f"{verb.lower()} {content} using {ctx.sc_desc.lower()} "
+        f"{ctx.connector} {ctx.condition_clean} guided by {ctx.vbe.lower()}."
     ).capitalize()
 
     variants = {
@@ -732,88 +454,333 @@ def generate():
         "Short": f"{verb.capitalize()} {content}."
     }
 
-    peo = next((p for p, plos in MAP["PEOtoPLO"].items() if plo in plos), None)
-
-    if ieg_input:
-        ieg = ieg_input
-    else:
-        ieg = next((i for i, peos in MAP["IEGtoPEO"].items() if peo in peos), "Paste IEG")
-
-    assessments = get_assessment(plo, bloom, domain, profile_assessment)
-    evidence = {a: get_evidence_for(a) for a in assessments}
-
-
-    LAST_CLO = {
+    return {
     # ======================
     # PROGRAMME CONTEXT
     # ======================
     "programme_name": programme_name,
     "course_name": course_name,
-    "ieg": ieg,
+    "ieg": ieg_input or ctx.ieg,
 
     # ======================
     # PEO
     # ======================
-    "peo": peo,
-     "peo_statement": (
-    peo_statement
-    if peo_statement
-    else MAP.get("PEOstatements", {}).get(peo, "")
-),
+    "peo": ctx.peo,
+    "peo_statement": peo_statement or ctx.peo_statement,
 
     # ======================
     # PLO
     # ======================
     "plo": plo,
-    "plo_statement": MAP["PLOstatements"].get(level, {}).get(
-        plo, "Full MQF-aligned PLO"
-    ),
-    "plo_indicator": (
-    plo_indicator
-    if plo_indicator
-    else "; ".join(
-        MAP.get("PLOindicators", {})
-        .get(level, {})
-        .get(plo, [])
-    )
-),
-
-        
+    "plo_statement": ctx.plo_statement,
+    "plo_indicator": plo_indicator or ctx.plo_indicator,
 
     # ======================
     # CLO
     # ======================
     "clo": clo,
+    "bloom": bloom,
     "clo_indicator": "≥60% achievement",
     "variants": variants,
 
     # ======================
     # ASSESSMENT
     # ======================
-    "assessments": assessments,
-    "evidence": evidence,
+    "assessments": ctx.assessments,
+    "evidence": dict(ctx.evidence),
 
     # ======================
     # MQF / VBE
     # ======================
-    "sc_code": details["SC_Code"],
-    "sc_desc": details["SC_Desc"],
-    "domain": details["Domain"],
-    "condition": meta["condition"],
-    "criterion": meta["criterion"],
-    "vbe": details["VBE"]
+    "sc_code": ctx.sc_code,
+    "sc_desc": ctx.sc_desc,
+    "domain": ctx.domain,
+    "condition": ctx.condition,
+    "criterion": ctx.criterion,
+    "vbe": ctx.vbe
 }
 
-    return jsonify(LAST_CLO)
+
+# ------------------------------------------------------
+# GENERATE CLO
+# ------------------------------------------------------
+def generate_inputs(fields, programme):
+    # every field build_clo reads, normalised the way build_clo does, and
+    # the programme mapping's version
+    inputs = {
+        name: field(fields, name)
+        for name in ("plo", "bloom", "verb", "content", "programmeName", "courseName")
+    }
+    inputs["profile"] = field(fields, "profile", "health").strip().lower()
+    inputs["level"] = field(fields, "level", "Degree")
+    for name in ("ieg", "peo_statement", "plo_indicator"):
+        inputs[name] = field(fields, name).strip()
+    inputs["programme"] = programme.version
+    return inputs
+
+
+@app.route("/generate", methods=["POST"])
+def generate():
+    # ?programme=<id> → IEG, PEO and statements from that mapping
+    programme = PROGRAMMES.get(request.args.get("programme"))
+    key = GENERATION_CACHE.key("generate", generate_inputs(request.form, programme))
+    cached = GENERATION_CACHE.get(key)
+    if cached:
+        result, body = cached
+    else:
+        try:
+            result = build_clo(request.form, programme=programme)
+        except CLOInputError as e:
+            return jsonify(e.payload()), 400
+        # the content digest is also the id /download and /download_rubric take
+        body = jsonify({"id": key, **result}).get_data()
+        GENERATION_CACHE.put(key, result, body)
+
+    RESULTS.put(result, key)
+    return generation_response(key, body, hit=cached is not None)
+
+
+@app.route("/api/cache/stats")
+def generation_cache_stats():
+    return jsonify(GENERATION_CACHE.stats())
+
+
+@app.route("/api/kb/stats")
+def knowledge_base_stats():
+    snap = KB.snapshot()
+    return jsonify({
+        "version": snap.version,
+        "source": snap.source,
+        "loaded_at": datetime.fromtimestamp(snap.loaded_at).isoformat(timespec="seconds"),
+        "contexts": context_stats(),
+        "programmes": PROGRAMMES.stats()
+    })
+
+
+# ------------------------------------------------------
+# GENERATE CLO — BATCH
+# ------------------------------------------------------
+@app.route("/api/generate/batch", methods=["POST"])
+def generate_batch():
+    # body: [{"profile", "plo", "bloom", "verb", "content", "level", ...}, ...]
+    # or {"rows": [...]}; bad rows are reported, never fail the batch;
+    # ?programme= as for /generate, one mapping for every row
+    programme = PROGRAMMES.get(request.args.get("programme"))
+    rows = request.get_json(silent=True)
+    if isinstance(rows, dict):
+        rows = rows.get("rows")
+    if not isinstance(rows, list):
+        return jsonify({"error": "Expected a JSON array of rows"}), 400
+    if len(rows) > BATCH_MAX_ROWS:
+        return jsonify({"error": f"Batch limited to {BATCH_MAX_ROWS} rows"}), 413
+
+    records = result_records(rows, lambda row, cache: build_clo(row, cache, True, programme))
+
+    # ?stream=ndjson|sse (or Accept) → one record per row as it is built
+    fmt = stream_format()
+    if fmt:
+        return stream_records(records, fmt)
+
+    results = list(records)
+    failed = sum(1 for r in results if not r["ok"])
+    return jsonify({
+        "count": len(rows),
+        "generated": len(rows) - failed,
+        "failed": failed,
+        "results": results
+    })
+
+
+# ------------------------------------------------------
+# GENERATE CLO — SPREADSHEET UPLOAD → COURSE CLO MATRIX
+# ------------------------------------------------------
+def upload_records(rows, build):
+    for number, row, result, error in generate_matrix(rows, build, CLOInputError):
+        if error:
+            yield {"row": number, "ok": False, "error": error}
+        else:
+            yield {"row": number, "ok": True, "result": result}
+
+
+@app.route("/api/generate/upload", methods=["POST"])
+def generate_upload():
+    # multipart "file": .csv or .xlsx with Course, PLO, Bloom, Verb,
+    # Content, Level, Profile columns — rows are streamed, never all loaded;
+    # ?programme= as for /generate
+    programme = PROGRAMMES.get(request.args.get("programme"))
+    build = partial(build_clo, programme=programme)
+    storage = request.files.get("file")
+    if storage is None or not storage.filename:
+        return jsonify({"error": "No file uploaded"}), 400
+
+    # ?stream=ndjson|sse → rows as they are generated instead of a workbook
+    fmt = stream_format()
+    if fmt:
+        spool = spool_upload(storage)
+        try:
+            rows = iter_upload_rows(storage, spool)
+        except UploadError as e:
+            spool.close()
+            return jsonify({"error": str(e)}), 400
+        return stream_records(upload_records(closing_rows(rows, spool), build), fmt)
+
+    try:
+        rows = iter_upload_rows(storage)
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    out = tempfile.TemporaryFile()
+    try:
+        records = generate_matrix(rows, build, CLOInputError)
+        generated, failed = write_matrix_workbook(records, out)
+    except UploadError as e:
+        out.close()
+        return jsonify({"error": str(e)}), 400
+
+    out.seek(0)
+    response = send_file(
+        out,
+        as_attachment=True,
+        download_name=f"CLO_Matrix_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+    response.headers["X-Rows-Generated"] = str(generated)
+    response.headers["X-Rows-Failed"] = str(failed)
+    return response
 
 
 # ------------------------------------------------------
-# DOWNLOADS
+# PROGRAMME COVERAGE MATRIX (PLO × COURSE × BLOOM)
 # ------------------------------------------------------
-@app.route("/download")
-def download_clo():
-    if not LAST_CLO:
-        return "No CLO generated", 400
+@app.route("/api/coverage", methods=["POST"])
+def programme_coverage():
+    # generated CLOs as JSON ([...], {"clos": [...]} or a batch response's
+    # {"results": [...]}) or a .csv/.xlsx upload with PLO, Bloom and Course
+    # columns — a CLO Matrix export works; ?format=xlsx → workbook
+    storage = request.files.get("file")
+    if storage is not None and storage.filename:
+        try:
+            records = iter_upload_rows(storage, required=("plo", "bloom"))
+        except UploadError as e:
+            return jsonify({"error": str(e)}), 400
+    else:
+        data = request.get_json(silent=True)
+        if isinstance(data, dict):
+            data = data.get("clos", data.get("results"))
+        if not isinstance(data, list):
+            return jsonify({"error": "Expected a JSON array of CLOs or a .csv/.xlsx upload"}), 400
+        # batch records wrap the CLO in "result"; failed rows carry none
+        records = [
+            r.get("result") or {} if isinstance(r, dict) and "ok" in r else r
+            for r in data if isinstance(r, dict)
+        ]
+
+    try:
+        coverage = compute_coverage(records)
+    except UploadError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if request.args.get("format", "").lower() != "xlsx":
+        return jsonify(coverage_payload(coverage))
+
+    out = BytesIO()
+    write_coverage_workbook(coverage, out)
+    out.seek(0)
+    return send_file(
+        out,
+        as_attachment=True,
+        download_name=f"Coverage_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
+        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    )
+
+
+# ------------------------------------------------------
+# COURSE WORKBOOK — MANY CLOs, STREAMED
+# ------------------------------------------------------
+@app.route("/api/export/course-workbook", methods=["POST"])
+def export_course_workbook():
+    # result ids from /generate and/or CLO payloads → one workbook with a
+    # sheet per course and a Summary; sent in chunks while it is written
+    # ?format=csv|ndjson|json → one flat table, rows streamed as ids resolve
+    try:
+        items = export_items(request.get_json(silent=True))
+        fmt = export_format()
+    except (ExportError, ExportFormatError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    name = f"CLO_Course_{datetime.now().strftime('%Y%m%d_%H%M')}"
+    if fmt != "xlsx":
+        return table_response(fmt, CLO_TABLE_HEADER, clo_rows(items, RESULTS.get), name)
+
+    return stream_written(
+        lambda out: write_course_workbook(items, RESULTS.get, out),
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        f"{name}.xlsx"
+    )
+
+
+# ------------------------------------------------------
+# RUBRICS — ONE ROW PER CLO FROM THE RUBRIC LIBRARY
+# ------------------------------------------------------
+@app.route("/api/export/rubrics", methods=["POST"])
+def export_rubrics():
+    # same body as /api/export/course-workbook → Excellent / Good /
+    # Satisfactory / Poor descriptors for every CLO, in one pass
+    try:
+        items = export_items(request.get_json(silent=True))
+        fmt = export_format()
+    except (ExportError, ExportFormatError) as e:
+        return jsonify({"error": str(e)}), 400
+
+    name = f"Rubrics_{datetime.now().strftime('%Y%m%d_%H%M')}"
+    if fmt != "xlsx":
+        rows = rubric_table_rows(resolved_clos(items, RESULTS.get))
+        return table_response(fmt, RUBRICS_HEADER, rows, name)
+
+    return stream_written(
+        lambda out: write_rubrics_workbook(resolved_clos(items, RESULTS.get), out),
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        f"{name}.xlsx"
+    )
+
+
+# ------------------------------------------------------
+# COURSE PACK — CLO + RUBRIC WORKBOOKS, MAPPING, MANIFEST (ZIP)
+# ------------------------------------------------------
+@app.route("/api/export/course-pack", methods=["POST"])
+def export_course_pack():
+    # same body as /api/export/course-workbook; ?level= picks the
+    # statements in each Mapping.csv, ?programme= the mapping
+    try:
+        items = export_items(request.get_json(silent=True))
+    except ExportError as e:
+        return jsonify({"error": str(e)}), 400
+    level = request.args.get("level", "Degree").strip()
+    programme = PROGRAMMES.get(request.args.get("programme"))
+
+    return stream_written(
+        lambda out: write_course_pack(items, RESULTS.get, out, programme, level),
+        "application/zip",
+        f"Course_Pack_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    )
+
+
+# ------------------------------------------------------
+# DOWNLOADS (built on the export job pool)
+# ------------------------------------------------------
+def stored_clo():
+    # (result, None) or (None, error response) for ?id= from /generate
+    result_id = request.args.get("id", "").strip()
+    if not result_id:
+        return None, ("No CLO generated", 400)
+    result = RESULTS.get(result_id)
+    if result is None:
+        return None, ("CLO not found or expired — generate it again", 404)
+    return result, None
+
+
+def write_clo_workbook(clo, out):
+    from openpyxl import Workbook
 
     wb = Workbook()
     ws = wb.active
@@ -821,50 +788,154 @@ def download_clo():
 
     ws.append(["Field", "Value"])
 
-    for key, val in LAST_CLO.items():
+    for key, val in clo.items():
         if isinstance(val, dict):
             val = json.dumps(val, ensure_ascii=False)
         elif isinstance(val, list):
             val = "; ".join(str(x) for x in val)
         ws.append([key, val])
 
-    out = BytesIO()
     wb.save(out)
-    out.seek(0)
 
-    return send_file(
-        out,
-        as_attachment=True,
-        download_name=f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
 
-@app.route("/download_rubric")
-def download_rubric():
-    if not LAST_CLO:
-        return "Generate CLO first", 400
+def clo_job_params(params):
+    # {"id": <result id>} or {"clo": {...}} → the CLO itself, so the job
+    # does not depend on the result store once it is queued
+    if not isinstance(params, dict):
+        raise JobError("Expected {\"id\": ...} or {\"clo\": {...}}")
+    if isinstance(params.get("clo"), dict):
+        return {"clo": params["clo"]}
+    result_id = str(params.get("id") or "").strip()
+    if not result_id:
+        raise JobError("No CLO generated")
+    result = RESULTS.get(result_id)
+    if result is None:
+        raise JobError("CLO not found or expired — generate it again")
+    return {"clo": result}
 
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Rubric"
 
-    ws.append(["Component","Description"])
-    ws.append(["Indicator", f"Ability to {LAST_CLO['clo']}"])
-    ws.append(["Excellent","Performs at excellent level"])
-    ws.append(["Good","Performs well"])
-    ws.append(["Satisfactory","Meets minimum level"])
-    ws.append(["Poor","Below expected"])
+def clo_job(params, out, progress):
+    write_clo_workbook(params["clo"], out)
+    return f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
 
-    out = BytesIO()
-    wb.save(out)
-    out.seek(0)
-    fname = f"Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
 
-    return send_file(
-        out, as_attachment=True,
-        download_name=fname,
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+def rubric_job(params, out, progress):
+    write_rubric_workbook(params["clo"], out)
+    return f"Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def course_workbook_job_params(params):
+    try:
+        return {"items": export_items(params)}
+    except ExportError as e:
+        raise JobError(str(e))
+
+
+def course_workbook_job(params, out, progress):
+    write_course_workbook(params["items"], RESULTS.get, out, progress)
+    return f"CLO_Course_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def rubrics_job(params, out, progress):
+    write_rubrics_workbook(resolved_clos(params["items"], RESULTS.get), out)
+    return f"Rubrics_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+def course_pack_job_params(params):
+    if not isinstance(params, dict):
+        raise JobError("Expected {\"ids\": [...], \"level\": ..., \"programme\": ...}")
+    params = dict(course_workbook_job_params(params), level=str(params.get("level") or "Degree"),
+                  programme=str(params.get("programme") or ""))
+    try:
+        PROGRAMMES.get(params["programme"])
+    except UnknownProgramme:
+        raise JobError(f"Unknown programme '{params['programme']}'")
+    return params
+
+
+def course_pack_job(params, out, progress):
+    write_course_pack(
+        params["items"], RESULTS.get, out,
+        PROGRAMMES.get(params["programme"]), params["level"], progress
     )
+    return f"Course_Pack_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+
+
+JOBS.register("clo", clo_job, clo_job_params)
+JOBS.register("rubric", rubric_job, clo_job_params)
+JOBS.register("course-workbook", course_workbook_job, course_workbook_job_params)
+JOBS.register("rubrics", rubrics_job, course_workbook_job_params)
+JOBS.register("course-pack", course_pack_job, course_pack_job_params, mimetype="application/zip")
+
+
+@app.route("/download")
+def download_clo():
+    clo, error = stored_clo()
+    if error:
+        return error
+    # text formats stream straight from the result; xlsx runs on the job pool
+    fmt, error = download_format()
+    if error:
+        return error
+    if fmt != "xlsx":
+        name = f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        return table_response(fmt, CLO_TABLE_HEADER, clo_rows([clo]), name)
+    return job_download("clo", {"clo": clo})
+
+@app.route("/download_rubric")
+def download_rubric():
+    clo, error = stored_clo()
+    if error:
+        return error
+    fmt, error = download_format()
+    if error:
+        return error
+    if fmt != "xlsx":
+        name = f"Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        return table_response(fmt, RUBRIC_HEADER, rubric_rows(clo), name)
+    return job_download("rubric", {"clo": clo})
+
+
+# ------------------------------------------------------
+# EXPORT JOBS
+# ------------------------------------------------------
+@app.route("/api/jobs", methods=["POST"])
+def submit_job():
+    # {"kind": "clo" | "rubric" | "rubrics" | "course-workbook" | "course-pack" |
+    #  "clo-only" | "clo-only-rubric", "params": {...}} → 202 + the job to poll
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or not isinstance(data.get("params", {}), (dict, list)):
+        return jsonify({"error": "Expected {\"kind\": ..., \"params\": {...}}"}), 400
+    try:
+        job = JOBS.submit(str(data.get("kind", "")), data.get("params") or {})
+    except JobError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": f"Export queue full ({e}) — try again shortly"}), 503, {"Retry-After": "5"}
+    return jsonify(job_payload(job)), 202, {"Location": url_for("job_status", job_id=job["id"])}
+
+
+@app.route("/api/jobs/<job_id>")
+def job_status(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    return jsonify(job_payload(job))
+
+
+@app.route("/api/jobs/<job_id>/result")
+def job_result(job_id):
+    job = JOBS.get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found or expired"}), 404
+    if job["status"] != "done":
+        return jsonify({"error": f"Job is {job['status']}", "job": job_payload(job)}), 409
+    return job_file(job)
+
+
+@app.route("/api/jobs/stats")
+def job_stats():
+    return jsonify(JOBS.stats())
 
 
 # ------------------------------------------------------
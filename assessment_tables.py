@@ -0,0 +1,365 @@
+# ======================================================
+# SCLOG — ASSESSMENT TABLES (FROZEN, BUILT ONCE AT IMPORT)
+# ======================================================
+#
+# Read-only views: dicts are MappingProxyType, lists are tuples, so the
+# memoised lookups below can hand out the same objects to every caller.
+# "analyse" is folded into "analyze" by bloom_key() instead of being
+# repeated in every table.
+
+from types import MappingProxyType
+from functools import lru_cache
+
+
+def freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+BLOOM_ALIASES = {"analyse": "analyze"}
+
+
+def bloom_key(bloom):
+    b = bloom.lower().strip()
+    return BLOOM_ALIASES.get(b, b)
+
+
+# ======================================================
+# BY PROFILE (app.py — /generate)
+# ======================================================
+# form "profile" → table key
+PROFILE_ASSESSMENT = MappingProxyType({
+    "health": "medical & health",
+    "sc": "computer science & it",
+    "eng": "engineering & technology",
+    "socs": "social sciences",
+    "edu": "education",
+    "bus": "business & management",
+    "arts": "arts & humanities"
+})
+
+# ===============================
+# COGNITIVE — BY PROFILE
+# ===============================
+PROFILE_COGNITIVE = freeze({
+
+    "medical & health": {
+        "remember": ["MCQ", "Quiz", "Recall questions"],
+        "understand": ["Short answer", "Concept explanation"],
+        "apply": ["Case-based discussion", "Short case", "Screening task"],
+        "analyze": ["Case analysis", "Journal critique"],
+        "evaluate": ["Long case", "Viva Voce", "Clinical decision justification"],
+        "create": ["Clinical management plan", "Health intervention proposal"]
+    },
+
+    "computer science & it": {
+        "remember": ["MCQ", "Quiz"],
+        "understand": ["Short answer", "Code explanation"],
+        "apply": ["Programming assignment", "Coding exercise"],
+        "analyze": ["Code analysis", "Debugging task"],
+        "evaluate": ["Code review", "System evaluation report"],
+        "create": ["Software project", "Capstone project"]
+    },
+
+    "engineering & technology": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Technical explanation"],
+        "apply": ["Problem-solving assignment", "Design exercise"],
+        "analyze": ["System analysis", "Technical report"],
+        "evaluate": ["Design evaluation", "Oral presentation"],
+        "create": ["Design project", "Capstone project"]
+    },
+
+    "social sciences": {
+        "remember": ["Test", "Reading quiz"],
+        "understand": ["Essay", "Discussion"],
+        "apply": ["Case study", "Fieldwork report"],
+        "analyze": ["Thematic analysis", "Policy analysis"],
+        "evaluate": ["Critical review", "Oral presentation"],
+        "create": ["Research project", "Policy proposal"]
+    },
+
+    "education": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Essay", "Reflection"],
+        "apply": ["Lesson plan", "Microteaching"],
+        "analyze": ["Teaching reflection report"],
+        "evaluate": ["Teaching evaluation", "Portfolio review"],
+        "create": ["Curriculum design project", "Action research"]
+    },
+
+    "business & management": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Essay", "Case discussion"],
+        "apply": ["Business case study", "Problem-solving assignment"],
+        "analyze": ["Financial analysis", "Market analysis"],
+        "evaluate": ["Strategy evaluation", "Oral presentation"],
+        "create": ["Business plan", "Consultancy project"]
+    },
+
+    "arts & humanities": {
+        "remember": ["Quiz", "Visual identification"],
+        "understand": ["Essay", "Artwork interpretation"],
+        "apply": ["Studio exercise", "Creative task"],
+        "analyze": ["Artwork analysis", "Critical review"],
+        "evaluate": ["Portfolio critique", "Oral presentation"],
+        "create": ["Creative project", "Final portfolio"]
+    }
+})
+
+# ===============================
+# AFFECTIVE — BY PROFILE
+# ===============================
+PROFILE_AFFECTIVE = freeze({
+
+    "medical & health": {
+        "receive": ["Professional awareness reflection"],
+        "respond": ["Ward / clinical participation"],
+        "value": ["Ethics & patient safety reflection"],
+        "organization": ["Interprofessional teamwork portfolio"],
+        "characterization": ["Clinical professionalism assessment"]
+    },
+
+    "computer science & it": {
+        "receive": ["Learning reflection"],
+        "respond": ["Participation in technical discussions"],
+        "value": ["Ethics in computing essay"],
+        "organization": ["Team-based software project portfolio"],
+        "characterization": ["Professional conduct in computing"]
+    },
+
+    "engineering & technology": {
+        "receive": ["Safety awareness reflection"],
+        "respond": ["Lab participation"],
+        "value": ["Engineering ethics reflection"],
+        "organization": ["Project team portfolio"],
+        "characterization": ["Professional engineering behaviour"]
+    },
+
+    "social sciences": {
+        "receive": ["Social awareness reflection"],
+        "respond": ["Seminar participation"],
+        "value": ["Ethical reasoning essay"],
+        "organization": ["Group research portfolio"],
+        "characterization": ["Professional social conduct"]
+    },
+
+    "education": {
+        "receive": ["Teaching values reflection"],
+        "respond": ["Classroom participation"],
+        "value": ["Ethics in education essay"],
+        "organization": ["Teaching portfolio"],
+        "characterization": ["Teacher professionalism assessment"]
+    },
+
+    "business & management": {
+        "receive": ["Business awareness reflection"],
+        "respond": ["Case discussion participation"],
+        "value": ["Business ethics essay"],
+        "organization": ["Team consultancy portfolio"],
+        "characterization": ["Professional business conduct"]
+    },
+
+    "arts & humanities": {
+        "receive": ["Creative awareness reflection"],
+        "respond": ["Studio participation"],
+        "value": ["Artistic values reflection"],
+        "organization": ["Creative portfolio"],
+        "characterization": ["Professional artistic practice"]
+    }
+})
+
+# ===============================
+# PSYCHOMOTOR — BY PROFILE
+# ===============================
+PROFILE_PSYCHOMOTOR = freeze({
+
+    "medical & health": {
+        "perception": ["Recognition of clinical signs"],
+        "set": ["Clinical preparation checklist"],
+        "guided response": ["Supervised clinical task"],
+        "mechanism": ["Clinical skills test", "OSCE"],
+        "complex overt response": ["OSCE", "Clinical simulation"],
+        "adaptation": ["Management of complex patients"],
+        "origination": ["Independent patient management"]
+    },
+
+    "computer science & it": {
+        "perception": ["Recognition of system requirements"],
+        "set": ["Development environment setup"],
+        "guided response": ["Guided coding task"],
+        "mechanism": ["Hands-on coding test"],
+        "complex overt response": ["System simulation"],
+        "adaptation": ["Code optimisation task"],
+        "origination": ["Independent software development"]
+    },
+
+    "engineering & technology": {
+        "perception": ["Identification of system components"],
+        "set": ["Lab setup checklist"],
+        "guided response": ["Guided laboratory task"],
+        "mechanism": ["Laboratory practical"],
+        "complex overt response": ["Integrated lab assessment"],
+        "adaptation": ["System troubleshooting"],
+        "origination": ["Independent engineering task"]
+    },
+
+    "social sciences": {
+        "perception": ["Observation of social phenomena"],
+        "set": ["Fieldwork preparation"],
+        "guided response": ["Guided data collection"],
+        "mechanism": ["Fieldwork practical"],
+        "complex overt response": ["Community-based simulation"],
+        "adaptation": ["Contextual analysis task"],
+        "origination": ["Independent field study"]
+    },
+
+    "education": {
+        "perception": ["Classroom observation"],
+        "set": ["Lesson preparation"],
+        "guided response": ["Guided teaching practice"],
+        "mechanism": ["Microteaching practical"],
+        "complex overt response": ["Teaching simulation"],
+        "adaptation": ["Adaptive teaching task"],
+        "origination": ["Independent teaching session"]
+    },
+
+    "business & management": {
+        "perception": ["Observation of business processes"],
+        "set": ["Business case preparation"],
+        "guided response": ["Guided business simulation"],
+        "mechanism": ["Business skills practical"],
+        "complex overt response": ["Management simulation"],
+        "adaptation": ["Strategic adjustment task"],
+        "origination": ["Independent consultancy task"]
+    },
+
+    "arts & humanities": {
+        "perception": ["Observation of artistic techniques"],
+        "set": ["Studio preparation"],
+        "guided response": ["Guided studio task"],
+        "mechanism": ["Studio practical"],
+        "complex overt response": ["Performance / exhibition simulation"],
+        "adaptation": ["Creative adaptation task"],
+        "origination": ["Independent creative production"]
+    }
+})
+
+PROFILE_TABLES = MappingProxyType({
+    "cognitive": PROFILE_COGNITIVE,
+    "affective": PROFILE_AFFECTIVE,
+    "psychomotor": PROFILE_PSYCHOMOTOR
+})
+
+
+# ======================================================
+# BY FIELD (utils.py — /clo-only/generate)
+# ======================================================
+FIELD_COGNITIVE = freeze({
+    "Medical & Health": {
+        "remember": ["MCQ", "Quiz", "Recall questions"],
+        "understand": ["Short answer", "Concept explanation"],
+        "apply": ["Case-based discussion", "Short case", "Screening task"],
+        "analyze": ["Case analysis", "Journal critique"],
+        "evaluate": ["Long case", "Viva Voce", "Clinical decision justification"],
+        "create": ["Clinical management plan", "Health intervention proposal"]
+    },
+    "Computer Science & IT": {
+        "remember": ["MCQ", "Quiz"],
+        "understand": ["Short answer", "Code explanation"],
+        "apply": ["Programming assignment", "Coding exercise"],
+        "analyze": ["Code analysis", "Debugging task"],
+        "evaluate": ["Code review", "System evaluation report"],
+        "create": ["Software project", "Capstone project"]
+    },
+    "Engineering & Technology": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Technical explanation"],
+        "apply": ["Problem-solving assignment", "Design exercise"],
+        "analyze": ["System analysis", "Technical report"],
+        "evaluate": ["Design evaluation", "Oral presentation"],
+        "create": ["Design project", "Capstone project"]
+    },
+    "Social Sciences": {
+        "remember": ["Test", "Reading quiz"],
+        "understand": ["Essay", "Discussion"],
+        "apply": ["Case study", "Fieldwork report"],
+        "analyze": ["Thematic analysis", "Policy analysis"],
+        "evaluate": ["Critical review", "Oral presentation"],
+        "create": ["Research project", "Policy proposal"]
+    },
+    "Education": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Essay", "Reflection"],
+        "apply": ["Lesson plan", "Microteaching"],
+        "analyze": ["Teaching reflection report"],
+        "evaluate": ["Teaching evaluation", "Portfolio review"],
+        "create": ["Curriculum design project", "Action research"]
+    },
+    "Business & Management": {
+        "remember": ["Test", "Quiz"],
+        "understand": ["Essay", "Case discussion"],
+        "apply": ["Business case study", "Problem-solving assignment"],
+        "analyze": ["Financial analysis", "Market analysis"],
+        "evaluate": ["Strategy evaluation", "Oral presentation"],
+        "create": ["Business plan", "Consultancy project"]
+    },
+    "Arts & Humanities": {
+        "remember": ["Quiz", "Visual identification"],
+        "understand": ["Essay", "Artwork interpretation"],
+        "apply": ["Studio exercise", "Creative task"],
+        "analyze": ["Artwork analysis", "Critical review"],
+        "evaluate": ["Portfolio critique", "Oral presentation"],
+        "create": ["Creative project", "Final portfolio"]
+    }
+})
+
+FIELD_AFFECTIVE = freeze({
+    "receive": ["Reflection log", "Learning journal"],
+    "respond": ["Participation", "Peer feedback", "Discussion activity"],
+    "value": ["Values / ethics essay", "Reflective portfolio"],
+    "organization": ["Group portfolio", "Team-based project"],
+    "characterization": ["Professional behaviour assessment", "360° feedback"]
+})
+
+FIELD_PSYCHOMOTOR = freeze({
+    "perception": ["Observation", "Recognition task"],
+    "set": ["Preparation checklist", "Readiness assessment"],
+    "guided response": ["Guided task", "Supervised practical"],
+    "mechanism": ["Skills test", "Practical examination"],
+    "complex overt response": ["OSCE", "Simulation assessment"],
+    "adaptation": ["Adapted task", "Advanced practical"],
+    "origination": ["Capstone practical", "Independent performance task"]
+})
+
+
+# ======================================================
+# MEMOISED LOOKUPS
+# ======================================================
+@lru_cache(maxsize=512)
+def profile_lookup(domain, profile, bloom):
+    return PROFILE_TABLES.get(domain, {}).get(profile, {}).get(bloom, ())
+
+
+@lru_cache(maxsize=128)
+def field_lookup(domain, bloom):
+    if domain == "cognitive":
+        return freeze({f: items[bloom] for f, items in FIELD_COGNITIVE.items() if bloom in items})
+    if domain == "affective":
+        return freeze({"Affective domain": FIELD_AFFECTIVE.get(bloom, ())})
+    if domain == "psychomotor":
+        return freeze({"Psychomotor domain": FIELD_PSYCHOMOTOR.get(bloom, ())})
+    return freeze({})
+
+
+def assessments_by_profile(domain, profile, bloom):
+    # → tuple of assessment names for one profile
+    return profile_lookup(domain.lower().strip(), profile.strip().lower(), bloom_key(bloom))
+
+
+def assessments_by_field(domain, bloom):
+    # → read-only {field: tuple of assessment names}
+    return field_lookup(domain.lower().strip(), bloom_key(bloom))
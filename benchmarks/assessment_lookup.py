@@ -0,0 +1,97 @@
+# ======================================================
+# SCLOG — get_assessment MICRO-BENCHMARK
+# ======================================================
+#
+#   python benchmarks/assessment_lookup.py [--calls N]
+#
+# "rebuild" reproduces the old behaviour — the three nested tables are
+# built afresh on every call (here by thawing the frozen tables back into
+# dicts/lists, the same allocations the old literals made) — and is
+# compared with the frozen, memoised lookups now used by app.py/utils.py.
+
+import os
+import sys
+import timeit
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from assessment_tables import (  # noqa: E402
+    PROFILE_TABLES, FIELD_COGNITIVE, FIELD_AFFECTIVE, FIELD_PSYCHOMOTOR,
+    assessments_by_profile, assessments_by_field
+)
+
+CASES = [
+    ("cognitive", "medical & health", "analyse"),
+    ("cognitive", "computer science & it", "apply"),
+    ("affective", "education", "value"),
+    ("psychomotor", "engineering & technology", "mechanism")
+]
+
+
+def thaw(value):
+    if hasattr(value, "items"):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def rebuild_profile(domain, profile, bloom):
+    tables = thaw(PROFILE_TABLES)
+    b = "analyze" if bloom == "analyse" else bloom
+    return tables.get(domain, {}).get(profile, {}).get(b, [])
+
+
+def rebuild_field(domain, bloom):
+    cognitive, affective, psychomotor = (
+        thaw(FIELD_COGNITIVE), thaw(FIELD_AFFECTIVE), thaw(FIELD_PSYCHOMOTOR)
+    )
+    b = "analyze" if bloom == "analyse" else bloom
+    if domain == "cognitive":
+        return {f: items[b] for f, items in cognitive.items() if b in items}
+    if domain == "affective":
+        return {"Affective domain": affective.get(b, [])}
+    return {"Psychomotor domain": psychomotor.get(b, [])}
+
+
+def run_rebuild():
+    for domain, profile, bloom in CASES:
+        rebuild_profile(domain, profile, bloom)
+        rebuild_field(domain, bloom)
+
+
+def run_frozen():
+    for domain, profile, bloom in CASES:
+        assessments_by_profile(domain, profile, bloom)
+        dict(assessments_by_field(domain, bloom))
+
+
+def peak_bytes(fn):
+    # memory a call has to allocate at once (the tables it builds)
+    fn()  # warm the memo caches
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="get_assessment micro-benchmark")
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    lookups = len(CASES) * 2
+    print(f"{'variant':<10} {'µs/lookup':>10} {'peak bytes/lookup':>18}")
+    for name, fn in (("rebuild", run_rebuild), ("frozen", run_frozen)):
+        seconds = timeit.timeit(fn, number=args.calls)
+        print(
+            f"{name:<10} {seconds / (args.calls * lookups) * 1e6:>10.2f} "
+            f"{peak_bytes(fn) // lookups:>18}"
+        )
+
+
+if __name__ == "__main__":
+    main()
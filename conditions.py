@@ -0,0 +1,66 @@
+# ======================================================
+# SCLOG — CONDITION NORMALISATION (CRITERION SHEET + conditions_db)
+# ======================================================
+#
+# Every condition is cleaned once per knowledge-base snapshot and kept
+# per (domain, bloom) as (criterion, condition) — the condition without
+# its leading connector, ready for "when …" / "by …" in a CLO. The
+# Criterion sheet wins; conditions_db.CONDITION_MAP fills the blooms the
+# sheet does not list.
+
+import re
+
+from conditions_db import CONDITION_MAP
+from knowledge_base import KB
+
+CONDITION_DEFAULTS = {
+    "cognitive": "interpreting tasks",
+    "affective": "engaging with peers",
+    "psychomotor": "performing skills"
+}
+
+# older workbook placeholders → wording used in CLOs
+CONDITION_PLACEHOLDERS = {
+    "applying analyze level cognitive processes": "evaluating information from multiple sources",
+    "applying evaluate level cognitive processes": "making judgments based on criteria",
+    "applying create level cognitive processes": "synthesising ideas into new solutions"
+}
+
+PLACEHOLDER_RE = re.compile("|".join(re.escape(p) for p in CONDITION_PLACEHOLDERS))
+CONNECTOR_RE = re.compile(r"^(?:(?:when|by)\s+)+")
+GUIDED_BY_RE = re.compile(r"\bguided by\b")
+
+
+def clean_condition(text):
+    # "when when evaluating …" → "evaluating …"; the CLO appends its own
+    # "guided by <VBE>", so a stray "guided by" is dropped too
+    text = PLACEHOLDER_RE.sub(lambda m: CONDITION_PLACEHOLDERS[m.group(0)], str(text or ""))
+    text = CONNECTOR_RE.sub("", text.strip())
+    text = GUIDED_BY_RE.sub("", text)
+    return " ".join(text.split())
+
+
+def build_condition_table(snap):
+    table = {}
+    for domain, blooms in CONDITION_MAP.items():
+        for bloom, entry in blooms.items():
+            table[(domain, bloom)] = (entry["criterion"], clean_condition(entry["condition"]))
+
+    for (domain, bloom), (criterion, condition) in snap.criterion_index.items():
+        table[(domain, bloom)] = (
+            criterion,
+            clean_condition(condition) or CONDITION_DEFAULTS.get(domain, "")
+        )
+    return table
+
+
+KB.derive("conditions", build_condition_table)
+
+
+def condition_for(snap, domain, bloom):
+    # (criterion, cleaned condition); unknown blooms get the domain default
+    domain = str(domain).lower()
+    found = KB.derived("conditions", snap).get((domain, str(bloom).lower()))
+    if found is not None:
+        return found
+    return "", CONDITION_DEFAULTS.get(domain, "")
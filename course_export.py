@@ -0,0 +1,210 @@
+# ======================================================
+# SCLOG — COURSE WORKBOOK EXPORT (MANY CLOs, STREAMED)
+# ======================================================
+#
+# One workbook for a whole course document or programme: a sheet per
+# course plus a Summary sheet. Items are result ids from /generate or CLO
+# payloads (/generate, /clo-only/generate, batch results). Sheets are
+# written one course at a time with xlsx_stream, each row going into the
+# output ZIP as it is appended, so the first bytes leave with the first
+# course. Each id is resolved once: the grouping pass spools the CLOs to a
+# temp file (in memory up to SCLOG_EXPORT_SPOOL_MB) and the sheets are
+# read back from it, so memory stays flat however many CLOs there are and
+# an id that expires mid-export cannot make two sheets disagree.
+
+import os
+import re
+import json
+import tempfile
+
+from coverage import record_course
+from xlsx_stream import StreamingWorkbook
+
+EXPORT_MAX_CLOS = int(os.environ.get("SCLOG_EXPORT_MAX_CLOS", "20000"))
+EXPORT_SPOOL_BYTES = int(os.environ.get("SCLOG_EXPORT_SPOOL_MB", "8")) * 1024 * 1024
+
+COURSE_HEADER = [
+    "No.", "PLO", "Bloom", "Domain", "CLO", "Short", "Condition", "Criterion",
+    "SC Code", "SC Description", "VBE", "Assessments", "Evidence"
+]
+
+# one flat table for the text formats (csv / ndjson / json)
+CLO_TABLE_HEADER = ["Course"] + COURSE_HEADER
+
+SHEET_TITLE_RE = re.compile(r"[\[\]:*?/\\]")
+
+
+class ExportError(ValueError):
+    pass
+
+
+# ------------------------------------------------------
+# Request body → items
+# ------------------------------------------------------
+def export_items(data):
+    # [id | CLO, ...], {"ids": [...], "clos": [...]} or a batch response's
+    # {"results": [{"ok", "result"}, ...]}; failed batch rows are dropped
+    if isinstance(data, dict):
+        items = list(data.get("ids") or []) + list(data.get("clos") or data.get("results") or [])
+    elif isinstance(data, list):
+        items = data
+    else:
+        raise ExportError("Expected CLO ids or CLO payloads")
+
+    out = []
+    for item in items:
+        if isinstance(item, dict) and "ok" in item:
+            item = item.get("result")
+        if isinstance(item, str) and item.strip():
+            out.append(item.strip())
+        elif isinstance(item, dict) and item.get("clo"):
+            out.append(item)
+    if not out:
+        raise ExportError("No CLOs to export")
+    if len(out) > EXPORT_MAX_CLOS:
+        raise ExportError(f"Export limited to {EXPORT_MAX_CLOS} CLOs")
+    return out
+
+
+# ------------------------------------------------------
+# CLO → row (/generate and /clo-only shapes)
+# ------------------------------------------------------
+def course_row(number, clo):
+    return [number] + course_fields(clo)
+
+
+def course_fields(clo):
+    # the row after "No."
+    meta = clo.get("meta") if isinstance(clo.get("meta"), dict) else {}
+    evidence = clo.get("evidence") or {}
+    return [
+        clo.get("plo") or meta.get("plo", ""),
+        clo.get("bloom") or meta.get("bloom", ""),
+        clo.get("domain") or meta.get("domain", ""),
+        clo.get("clo", ""),
+        (clo.get("variants") or {}).get("Short", ""),
+        clo.get("condition") or meta.get("condition", ""),
+        clo.get("criterion", ""),
+        clo.get("sc_code", ""),
+        clo.get("sc_desc") or meta.get("sc", ""),
+        clo.get("vbe") or meta.get("vbe", ""),
+        "; ".join(clo.get("assessments") or []),
+        json.dumps(evidence, ensure_ascii=False) if evidence else ""
+    ]
+
+
+def clo_rows(items, resolve=None):
+    # items in request order, one row each — nothing grouped or held, so
+    # the text formats stream as fast as the ids resolve
+    number = 0
+    for item in items:
+        clo = resolve(item) if isinstance(item, str) else item
+        if clo is None:
+            continue
+        number += 1
+        yield [record_course(clo)] + course_row(number, clo)
+
+
+def sheet_title(name, used):
+    # Excel: ≤ 31 chars, no []:*?/\, unique regardless of case
+    base = SHEET_TITLE_RE.sub("-", name).strip("'").strip() or "Course"
+    base = base[:31]
+    title, n = base, 1
+    while title.lower() in used or title.lower() == "summary":
+        n += 1
+        suffix = f" ({n})"
+        title = base[:31 - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
+
+
+# ------------------------------------------------------
+# Workbook
+# ------------------------------------------------------
+def resolved_clos(items, resolve):
+    # items in request order as CLOs; ids that no longer resolve are skipped
+    for item in items:
+        clo = resolve(item) if isinstance(item, str) else item
+        if clo is not None:
+            yield clo
+
+
+class CourseSpool:
+    # keep(CLO) grouped by course: JSON lines in one temp file, offsets in
+    # memory; keep() trims a CLO to what the reader needs
+    def __init__(self, items, resolve, keep=course_fields):
+        self.file = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+        self.courses = {}           # course → [offsets], first-seen order
+        self.missing = []
+        for item in items:
+            clo = resolve(item) if isinstance(item, str) else item
+            if clo is None:
+                self.missing.append(item)
+                continue
+            self.courses.setdefault(record_course(clo), []).append(self.file.tell())
+            self.file.write(json.dumps(keep(clo), ensure_ascii=False).encode("utf-8") + b"\n")
+
+    def values(self, course):
+        for offset in self.courses[course]:
+            self.file.seek(offset)
+            yield json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_course_workbook(items, resolve, out, progress=None):
+    # resolve(id) → stored CLO or None; progress(done, total) after each
+    # course sheet; returns (exported, missing ids)
+    with CourseSpool(items, resolve) as spool:
+        return write_course_sheets(
+            ((course, spool.values(course)) for course in spool.courses),
+            spool.missing, out, progress, len(items)
+        )
+
+
+def write_course_sheets(courses, missing, out, progress=None, total=None):
+    # courses: (course, course_fields rows) pairs, one sheet each, closed
+    # before the next one opens; the Summary sheet goes last
+    wb = StreamingWorkbook(out)
+    used = set()
+    summary = []
+
+    for course, rows in courses:
+        ws = wb.create_sheet(sheet_title(course, used))
+        ws.append(COURSE_HEADER)
+        plos, blooms = [], []
+        written = 0
+        try:
+            for fields in rows:
+                written += 1
+                row = [written] + fields
+                ws.append(row)
+                if row[1] and row[1] not in plos:
+                    plos.append(row[1])
+                if row[2] and row[2] not in blooms:
+                    blooms.append(row[2])
+        finally:
+            ws.close()
+        summary.append([course, ws.title, written, ", ".join(plos), ", ".join(blooms)])
+        if progress:
+            progress(sum(row[2] for row in summary), total)
+
+    ws = wb.create_sheet("Summary")
+    ws.append(["Course", "Sheet", "CLOs", "PLOs", "Bloom levels"])
+    for row in summary:
+        ws.append(row)
+    exported = sum(row[2] for row in summary)
+    ws.append([])
+    ws.append(["Courses", len(summary)])
+    ws.append(["CLOs", exported])
+    ws.append(["Missing / expired ids", ", ".join(missing)])
+
+    wb.close()
+    return exported, missing
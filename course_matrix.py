@@ -0,0 +1,203 @@
+# ======================================================
+# SCLOG — COURSE CLO MATRIX (CSV / XLSX UPLOAD → WORKBOOK)
+# ======================================================
+
+import io
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+UPLOAD_MAX_ROWS = int(os.environ.get("SCLOG_UPLOAD_MAX_ROWS", "50000"))
+
+# upload header (lower-case, no spaces/underscores) → generate() form field
+UPLOAD_COLUMNS = {
+    "course": "courseName",
+    "coursename": "courseName",
+    "programme": "programmeName",
+    "programmename": "programmeName",
+    "plo": "plo",
+    "bloom": "bloom",
+    "bloomlevel": "bloom",
+    "verb": "verb",
+    "content": "content",
+    "level": "level",
+    "profile": "profile",
+    "ieg": "ieg"
+}
+
+# required form field → column name used in error messages
+REQUIRED_LABELS = {"plo": "PLO", "content": "Content", "bloom": "Bloom", "courseName": "Course"}
+
+MATRIX_HEADER = [
+    "Row", "Course", "PLO", "Bloom", "Level", "Profile",
+    "CLO", "Critical Thinking", "Short",
+    "Assessments", "Evidence", "Condition", "Criterion",
+    "SC Code", "SC Description", "VBE", "Domain", "Error"
+]
+
+
+class UploadError(ValueError):
+    pass
+
+
+# ------------------------------------------------------
+# Streaming readers — one row in memory at a time; the header is
+# read eagerly so a bad upload fails before any output is written
+# ------------------------------------------------------
+def column_key(name):
+    return str(name or "").strip().lower().replace(" ", "").replace("_", "")
+
+
+def map_header(header, required=("plo", "content")):
+    fields = [UPLOAD_COLUMNS.get(column_key(h)) for h in header]
+    if any(name not in fields for name in required):
+        labels = [REQUIRED_LABELS.get(name, name) for name in required]
+        raise UploadError(f"Upload needs at least {', '.join(labels[:-1])} and {labels[-1]} columns")
+    return fields
+
+
+def rows_from_pairs(header, values_iter, required=("plo", "content")):
+    fields = map_header(header, required)
+
+    def rows():
+        for values in values_iter:
+            row = {
+                f: ("" if v is None else str(v).strip())
+                for f, v in zip(fields, values)
+                if f
+            }
+            if any(row.values()):
+                yield row
+    return rows()
+
+
+def open_csv_rows(stream, required=("plo", "content")):
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    reader = csv.reader(text)
+    header = next(reader, None)
+    if header is None:
+        raise UploadError("Empty upload")
+    return rows_from_pairs(header, reader, required)
+
+
+def open_xlsx_rows(stream, required=("plo", "content")):
+    from openpyxl import load_workbook
+
+    try:
+        wb = load_workbook(stream, read_only=True, data_only=True)
+    except Exception:
+        raise UploadError("Could not read the xlsx upload")
+
+    values = wb.worksheets[0].iter_rows(values_only=True)
+    header = next(values, None)
+    if header is None:
+        wb.close()
+        raise UploadError("Empty upload")
+    rows = rows_from_pairs(header, values, required)
+
+    def closing():
+        try:
+            yield from rows
+        finally:
+            wb.close()
+    return closing()
+
+
+def limit_rows(rows):
+    for count, row in enumerate(rows, start=1):
+        if count > UPLOAD_MAX_ROWS:
+            raise UploadError(f"Upload limited to {UPLOAD_MAX_ROWS} rows")
+        yield row
+
+
+def iter_upload_rows(storage, stream=None, required=("plo", "content")):
+    # `stream` overrides storage.stream, e.g. a spooled copy that outlives
+    # the request for streamed responses
+    name = (storage.filename or "").lower()
+    stream = stream or storage.stream
+    if name.endswith(".csv"):
+        return limit_rows(open_csv_rows(stream, required))
+    if name.endswith((".xlsx", ".xlsm")):
+        return limit_rows(open_xlsx_rows(stream, required))
+    raise UploadError("Upload a .csv or .xlsx file")
+
+
+def spool_upload(storage):
+    # copy the upload in chunks to a temp file we own — Flask closes
+    # request.files before a streamed response body is iterated
+    spool = tempfile.TemporaryFile()
+    shutil.copyfileobj(storage.stream, spool)
+    spool.seek(0)
+    return spool
+
+
+def closing_rows(rows, handle):
+    try:
+        yield from rows
+    finally:
+        handle.close()
+
+
+# ------------------------------------------------------
+# Generation + write-only workbook
+# ------------------------------------------------------
+def generate_matrix(rows, build, error_type):
+    # yields (row number, input row, result or None, error message or None);
+    # `build` is app.build_clo, called with one memo shared by all rows
+    cache = {}
+    for number, row in enumerate(rows, start=1):
+        try:
+            yield number, row, build(row, cache, True), None
+        except error_type as e:
+            yield number, row, None, str(e)
+
+
+def matrix_row(number, row, result, error):
+    if result is None:
+        return [
+            number, row.get("courseName", ""), row.get("plo", ""), row.get("bloom", ""),
+            row.get("level", ""), row.get("profile", ""),
+            "", "", "", "", "", "", "", "", "", "", "", error
+        ]
+
+    variants = result["variants"]
+    return [
+        number, result["course_name"], result["plo"], row.get("bloom", ""),
+        row.get("level", "") or "Degree", row.get("profile", "") or "health",
+        result["clo"], variants.get("Critical Thinking", ""), variants.get("Short", ""),
+        "; ".join(result["assessments"]),
+        json.dumps(result["evidence"], ensure_ascii=False),
+        result["condition"], result["criterion"],
+        result["sc_code"], result["sc_desc"], result["vbe"], result["domain"],
+        ""
+    ]
+
+
+def write_matrix_workbook(records, out):
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("CLO Matrix")
+    ws.append(MATRIX_HEADER)
+
+    generated = failed = 0
+    try:
+        for number, row, result, error in records:
+            ws.append(matrix_row(number, row, result, error))
+            if error:
+                failed += 1
+            else:
+                generated += 1
+    except Exception:
+        ws.close()
+        raise
+
+    summary = wb.create_sheet("Summary")
+    summary.append(["Rows", generated + failed])
+    summary.append(["Generated", generated])
+    summary.append(["Failed", failed])
+
+    wb.save(out)
+    return generated, failed
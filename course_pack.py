@@ -0,0 +1,135 @@
+# ======================================================
+# SCLOG — COURSE PACK (STREAMED ZIP)
+# ======================================================
+#
+# Everything staff download per course, in one archive:
+#
+#   <course>/CLOs.xlsx      the course workbook (course_export)
+#   <course>/Rubrics.xlsx   rubric-library descriptors, one row per CLO
+#   <course>/Mapping.csv    IEG → PEO → PLO rows for the course's PLOs
+#   manifest.json           courses, members, sizes, sha256, KB version
+#
+# The ZIP is written to an unseekable stream (streaming.stream_written),
+# and every member is deflated as it is written — no member and no part
+# of the archive is ever complete in memory. Each id is resolved once
+# (course_export.CourseSpool); a course's CLOs are then read back as one
+# list that all three members and the manifest counts are built from.
+
+import re
+import json
+import hashlib
+import zipfile
+from contextlib import contextmanager
+from datetime import datetime
+
+from knowledge_base import KB
+from course_export import CourseSpool, course_fields, write_course_sheets
+from export_formats import csv_lines
+from rubrics import write_rubrics_workbook
+
+MAPPING_HEADER = ["IEG", "PEO", "PLO", "PEO Statement", "PLO Statement", "CLOs"]
+
+FOLDER_RE = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class HashingWriter:
+    # counts and hashes what goes into a ZIP member
+    def __init__(self, raw):
+        self.raw = raw
+        self.size = 0
+        self.digest = hashlib.sha256()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.digest.update(data)
+        self.size += len(data)
+        return self.raw.write(data)
+
+    def flush(self):
+        self.raw.flush()
+
+
+@contextmanager
+def member(zf, name, listing):
+    with zf.open(name, "w") as raw:
+        writer = HashingWriter(raw)
+        yield writer
+    listing.append({"name": name, "bytes": writer.size, "sha256": writer.digest.hexdigest()})
+
+
+def member_folder(course, used):
+    folder = FOLDER_RE.sub("-", course).strip(" .") or "Course"
+    name, n = folder, 1
+    while name.lower() in used:
+        n += 1
+        name = f"{folder} ({n})"
+    used.add(name.lower())
+    return name
+
+
+def mapping_rows(plo_counts, programme, level):
+    # one row per IEG → PEO → PLO path of each PLO the course covers
+    graph, front = programme.graph, programme.front
+    peo_statements = front["PEOstatements"].get(level, {})
+    plo_statements = front["PLOstatements"].get(level, {})
+    for plo, count in plo_counts.items():
+        for peo in graph["PLOtoPEO"].get(plo) or [""]:
+            for ieg in graph["PEOtoIEG"].get(peo) or [""]:
+                yield [ieg, peo, plo, peo_statements.get(peo, ""), plo_statements.get(plo, ""), count]
+
+
+def write_course_pack(items, resolve, out, programme, level="Degree", progress=None):
+    # items / resolve as for course_export.write_course_workbook;
+    # `programme` is a programmes.ProgrammeMapping
+    with CourseSpool(items, resolve, keep=dict) as spool:
+        return write_spooled_pack(spool, len(items), out, programme, level, progress)
+
+
+def write_spooled_pack(spool, total, out, programme, level, progress):
+    manifest = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "kb_version": KB.snapshot().version,
+        "programme": programme.programme,
+        "level": level,
+        "clos": 0,
+        "courses": [],
+        "missing": spool.missing
+    }
+
+    used = set()
+    with zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        for course in spool.courses:
+            clos = list(spool.values(course))
+            rows = [course_fields(clo) for clo in clos]
+            folder = member_folder(course, used)
+            members = []
+
+            with member(zf, f"{folder}/CLOs.xlsx", members) as f:
+                write_course_sheets([(course, rows)], [], f)
+            with member(zf, f"{folder}/Rubrics.xlsx", members) as f:
+                write_rubrics_workbook(clos, f)
+
+            plo_counts = {}
+            for row in rows:
+                plo = str(row[0] or "").strip()
+                if plo:
+                    plo_counts[plo] = plo_counts.get(plo, 0) + 1
+            with member(zf, f"{folder}/Mapping.csv", members) as f:
+                for line in csv_lines(MAPPING_HEADER, mapping_rows(plo_counts, programme, level)):
+                    f.write(line.encode("utf-8"))
+
+            manifest["clos"] += len(clos)
+            manifest["courses"].append({
+                "course": course,
+                "folder": folder,
+                "clos": len(clos),
+                "plos": list(plo_counts),
+                "members": members
+            })
+            if progress:
+                progress(manifest["clos"], total)
+
+        zf.writestr("manifest.json", json.dumps(manifest, ensure_ascii=False, indent=2))
+    return manifest
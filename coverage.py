@@ -0,0 +1,275 @@
+# ======================================================
+# SCLOG — PROGRAMME COVERAGE MATRIX (PLO × COURSE × BLOOM)
+# ======================================================
+#
+# Counts a programme's CLOs into a PLO × course × Bloom-level array and
+# rolls it up to PEOs and IEGs through the PEOtoPLO / IEGtoPEO mapping.
+# Records are only walked once to factorise their labels; counting and
+# roll-ups are numpy array operations.
+#
+#     python coverage.py clos.csv -o coverage.xlsx
+#     python coverage.py clo_matrix.xlsx --json
+
+import os
+import sys
+import json
+
+from knowledge_base import KB, BLOOM_SHEETS
+from assessment_tables import BLOOM_ALIASES
+
+NO_COURSE = "(no course)"
+
+
+# ------------------------------------------------------
+# Record fields (generated CLO, batch row or upload row)
+# ------------------------------------------------------
+def record_course(record):
+    course = (
+        record.get("course_name") or record.get("courseName") or record.get("course") or ""
+    )
+    return str(course).strip() or NO_COURSE
+
+
+def record_fields(record):
+    # → (plo, course, bloom) or None when the record names no PLO
+    plo = str(record.get("plo") or "").strip()
+    if not plo:
+        return None
+    bloom = record.get("bloom_key") or record.get("bloom") or ""
+    if not bloom and isinstance(record.get("meta"), dict):
+        bloom = record["meta"].get("bloom") or ""
+    return plo, record_course(record), str(bloom).strip()
+
+
+def bloom_axis(snap):
+    # canonical Bloom order (Remember … Create, Receiving …, Perception …),
+    # lower-case/alias → display name and display name → domain
+    order, names, domains = [], {}, {}
+    for domain, sheet in BLOOM_SHEETS.items():
+        for level in snap.bloom_index[sheet]["levels"]:
+            if level.lower() not in names:
+                names[level.lower()] = level
+                domains[level] = domain
+                order.append(level)
+    for alias, bloom in BLOOM_ALIASES.items():
+        if bloom in names:
+            names[alias] = names[bloom]
+    return order, names, domains
+
+
+def axis_labels(declared, mapped):
+    # programme order from SCLOG_front.json, then anything only the mapping names
+    labels = list(declared or [])
+    labels.extend(label for label in mapped if label not in labels)
+    return labels
+
+
+def factorise(values, axis):
+    # labels → integer codes; `axis` is extended with unseen labels
+    codes = {label: i for i, label in enumerate(axis)}
+    out = []
+    for value in values:
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(axis)
+            axis.append(value)
+        out.append(code)
+    return out
+
+
+def incidence(np, rows, cols, edges):
+    # boolean rows × cols matrix from {row label: [col labels]}
+    col_index = {c: j for j, c in enumerate(cols)}
+    matrix = np.zeros((len(rows), len(cols)), dtype=bool)
+    for i, row in enumerate(rows):
+        for col in edges.get(row, []):
+            j = col_index.get(col)
+            if j is not None:
+                matrix[i, j] = True
+    return matrix
+
+
+# ------------------------------------------------------
+# Engine
+# ------------------------------------------------------
+def compute_coverage(records, snap=None):
+    import numpy as np
+
+    snap = snap or KB.snapshot()
+    graph = snap.graph
+
+    plos = axis_labels(snap.front.get("PLOs"), graph["PLOtoPEO"])
+    blooms, bloom_names, bloom_domains = bloom_axis(snap)
+    courses = []
+
+    fields = []
+    skipped = 0
+    for record in records:
+        found = record_fields(record)
+        if found is None:
+            skipped += 1
+            continue
+        plo, course, bloom = found
+        fields.append((plo, course, bloom_names.get(bloom.lower(), bloom or "(no bloom)")))
+
+    if fields:
+        plo_values, course_values, bloom_values = zip(*fields)
+    else:
+        plo_values = course_values = bloom_values = ()
+    p = np.array(factorise(plo_values, plos), dtype=np.int64)
+    c = np.array(factorise(course_values, courses), dtype=np.int64)
+    b = np.array(factorise(bloom_values, blooms), dtype=np.int64)
+
+    shape = (len(plos), len(courses), len(blooms))
+    flat = (p * shape[1] + c) * shape[2] + b
+    counts = np.bincount(flat, minlength=shape[0] * shape[1] * shape[2]).reshape(shape)
+
+    # roll-ups: a PLO counts once towards each PEO/IEG it reaches
+    peos = axis_labels(snap.front.get("PEOs"), graph["PEOtoPLO"])
+    iegs = axis_labels(snap.front.get("IEGs"), graph["IEGtoPEO"])
+    peo_plo = incidence(np, peos, plos, graph["PEOtoPLO"])
+    ieg_peo = incidence(np, iegs, peos, graph["IEGtoPEO"])
+    ieg_plo = (ieg_peo.astype(np.int64) @ peo_plo.astype(np.int64)) > 0
+
+    peo_counts = np.tensordot(peo_plo.astype(np.int64), counts, axes=1)
+    ieg_counts = np.tensordot(ieg_plo.astype(np.int64), counts, axes=1)
+
+    return {
+        "clos": len(fields),
+        "skipped": skipped,
+        "axes": {"plo": plos, "course": courses, "bloom": blooms},
+        "counts": counts,
+        "plo_summary": summary_rows("plo", plos, counts, blooms, bloom_domains),
+        "peo_rollup": summary_rows("peo", peos, peo_counts, blooms, bloom_domains, peo_plo, plos),
+        "ieg_rollup": summary_rows("ieg", iegs, ieg_counts, blooms, bloom_domains, ieg_plo, plos),
+        "uncovered_plos": [plos[i] for i in np.flatnonzero(counts.sum(axis=(1, 2)) == 0)]
+    }
+
+
+def summary_rows(key, labels, counts, blooms, domains, members=None, plos=None):
+    # one row per label: totals, courses touched, per-Bloom counts and the
+    # highest Bloom level reached per domain (last non-zero of that domain
+    # on the canonical axis; levels outside the taxonomy have no rank)
+    by_bloom = counts.sum(axis=1)
+    totals = by_bloom.sum(axis=1)
+    courses = (counts.sum(axis=2) > 0).sum(axis=1)
+
+    rows = []
+    for i, label in enumerate(labels):
+        reached = by_bloom[i].nonzero()[0]
+        highest = {}
+        for j in reached:
+            if blooms[j] in domains:
+                highest[domains[blooms[j]]] = blooms[j]
+        row = {
+            key: label,
+            "clos": int(totals[i]),
+            "courses": int(courses[i]),
+            "blooms": {blooms[j]: int(by_bloom[i, j]) for j in reached},
+            "highest_bloom": highest
+        }
+        if members is not None:
+            row["plos"] = [plos[j] for j in members[i].nonzero()[0]]
+        rows.append(row)
+    return rows
+
+
+def coverage_payload(coverage):
+    # JSON body — the dense array becomes nested lists
+    payload = dict(coverage)
+    payload["counts"] = coverage["counts"].tolist()
+    return payload
+
+
+# ------------------------------------------------------
+# Write-only workbook
+# ------------------------------------------------------
+def write_coverage_workbook(coverage, out):
+    from openpyxl import Workbook
+
+    counts = coverage["counts"]
+    plos, courses, blooms = (coverage["axes"][k] for k in ("plo", "course", "bloom"))
+
+    wb = Workbook(write_only=True)
+
+    ws = wb.create_sheet("PLO x Course")
+    ws.append(["PLO"] + courses + ["Total"])
+    by_course = counts.sum(axis=2)
+    for i, plo in enumerate(plos):
+        ws.append([plo] + by_course[i].tolist() + [int(by_course[i].sum())])
+
+    ws = wb.create_sheet("PLO x Bloom")
+    highest = [f"Highest {domain.capitalize()}" for domain in BLOOM_SHEETS]
+    ws.append(["PLO"] + blooms + ["Total"] + highest)
+    for row in coverage["plo_summary"]:
+        ws.append([row["plo"]] + [row["blooms"].get(b, 0) for b in blooms]
+                  + [row["clos"]] + [row["highest_bloom"].get(d, "") for d in BLOOM_SHEETS])
+
+    for title, key, rows in (("PEO Roll-up", "peo", coverage["peo_rollup"]),
+                             ("IEG Roll-up", "ieg", coverage["ieg_rollup"])):
+        ws = wb.create_sheet(title)
+        ws.append([key.upper(), "PLOs"] + blooms + ["Total", "Courses"] + highest)
+        for row in rows:
+            ws.append([row[key], ", ".join(row["plos"])]
+                      + [row["blooms"].get(b, 0) for b in blooms]
+                      + [row["clos"], row["courses"]]
+                      + [row["highest_bloom"].get(d, "") for d in BLOOM_SHEETS])
+
+    # long format for pivoting: only the non-zero cells
+    ws = wb.create_sheet("Detail")
+    ws.append(["PLO", "Course", "Bloom", "CLOs"])
+    for i, j, k in zip(*counts.nonzero()):
+        ws.append([plos[i], courses[j], blooms[k], int(counts[i, j, k])])
+
+    ws = wb.create_sheet("Summary")
+    ws.append(["CLOs", coverage["clos"]])
+    ws.append(["Skipped (no PLO)", coverage["skipped"]])
+    ws.append(["Courses", len(courses)])
+    ws.append(["Uncovered PLOs", ", ".join(coverage["uncovered_plos"])])
+
+    wb.save(out)
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+def read_records(path):
+    from course_matrix import open_csv_rows, open_xlsx_rows
+
+    if path.endswith(".json"):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data.get("clos", data.get("rows", [])) if isinstance(data, dict) else data
+
+    stream = open(path, "rb")
+    if path.lower().endswith(".csv"):
+        return open_csv_rows(stream, required=("plo", "bloom"))
+    return open_xlsx_rows(stream, required=("plo", "bloom"))
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SCLOG programme coverage matrix")
+    parser.add_argument("source", help="CLOs as .csv, .xlsx (e.g. a CLO Matrix export) or .json")
+    parser.add_argument("-o", "--output", help="write the coverage workbook here (.xlsx)")
+    parser.add_argument("--json", action="store_true", help="print the coverage as JSON")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    coverage = compute_coverage(read_records(args.source))
+    elapsed = time.perf_counter() - started
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            write_coverage_workbook(coverage, f)
+    if args.json:
+        json.dump(coverage_payload(coverage), sys.stdout, ensure_ascii=False, indent=2)
+        print()
+    print(
+        f"{coverage['clos']} CLOs ({coverage['skipped']} skipped) × "
+        f"{len(coverage['axes']['course'])} courses in {elapsed * 1000:.0f} ms"
+        + (f" → {os.path.abspath(args.output)}" if args.output else ""),
+        file=sys.stderr
+    )
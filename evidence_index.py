@@ -0,0 +1,212 @@
+# ======================================================
+# SCLOG — ASSESSMENT → EVIDENCE INDEX
+# ======================================================
+#
+# Evidence is every keyword table entry whose key occurs in the
+# (lower-cased) assessment name, in table order, de-duplicated. Names the
+# assessment tables can produce are resolved once at import; anything
+# else (free text from uploads) goes through one Aho-Corasick pass over
+# all keys instead of a substring test per key.
+
+from collections import deque
+from functools import lru_cache
+
+from assessment_tables import PROFILE_TABLES, FIELD_COGNITIVE, FIELD_AFFECTIVE, FIELD_PSYCHOMOTOR
+
+NO_EVIDENCE = ("Assessment evidence",)
+
+
+# ======================================================
+# KEYWORD TABLES
+# ======================================================
+# app.py — /generate
+PROFILE_EVIDENCE_MAP = {
+
+    # TEST / QUIZ
+    "mcq": ["Score report"],
+    "quiz": ["Quiz score"],
+    "test": ["Test score report"],
+    "recall": ["Marked answer script"],
+
+    # WRITTEN / ESSAY
+    "short answer": ["Marked answer script"],
+    "essay": ["Written essay"],
+    "concept explanation": ["Written explanation"],
+    "code explanation": ["Annotated code explanation"],
+    "technical explanation": ["Written technical explanation"],
+
+    # CASE / DISCUSSION
+    "case-based discussion": ["CbD record", "Supervisor feedback"],
+    "short case": ["Short case assessment form"],
+    "long case": ["Long case report", "Examiner evaluation form"],
+    "case study": ["Case study report"],
+    "case analysis": ["Case analysis worksheet"],
+    "discussion": ["Discussion participation record"],
+    "journal critique": ["Journal critique report"],
+
+    # CLINICAL / PRACTICAL
+    "screening": ["Screening checklist"],
+    "skills test": ["Skills checklist"],
+    "osce": ["OSCE score sheet"],
+    "simulation": ["Simulation checklist"],
+    "observation": ["Observation checklist"],
+    "guided task": ["Supervisor observation form"],
+
+    # PROGRAMMING / IT
+    "programming assignment": ["Source code submission", "Grading rubric"],
+    "coding exercise": ["Code submission"],
+    "debugging": ["Debugging report"],
+    "code analysis": ["Code review report"],
+    "code review": ["Code review rubric"],
+
+    # ENGINEERING / DESIGN
+    "design exercise": ["Design documentation"],
+    "design project": ["Project report", "Design artefact"],
+    "system analysis": ["System analysis report"],
+    "technical report": ["Technical report"],
+
+    # EDUCATION
+    "lesson plan": ["Lesson plan document"],
+    "microteaching": ["Teaching observation rubric"],
+    "teaching evaluation": ["Teaching evaluation form"],
+    "portfolio review": ["Portfolio evidence"],
+
+    # BUSINESS / SOCIAL SCIENCE
+    "financial analysis": ["Financial analysis report"],
+    "market analysis": ["Market analysis report"],
+    "policy analysis": ["Policy analysis report"],
+    "fieldwork": ["Fieldwork report"],
+    "consultancy": ["Consultancy report"],
+
+    # PROJECT / RESEARCH / CREATIVE
+    "project": ["Project documentation"],
+    "capstone": ["Capstone project report"],
+    "research": ["Research report"],
+    "proposal": ["Proposal document"],
+    "business plan": ["Business plan document"],
+    "creative project": ["Creative artefact", "Project reflection"],
+    "portfolio": ["Portfolio evidence"],
+
+    # AFFECTIVE / PROFESSIONAL
+    "reflection": ["Reflection journal"],
+    "participation": ["Participation record"],
+    "peer feedback": ["Peer feedback form"],
+    "professional": ["Professional behaviour evaluation"],
+    "ethics": ["Ethics reflection"],
+    "presentation": ["Presentation rubric"]
+}
+
+# utils.py — /clo-only/generate
+FIELD_EVIDENCE_MAP = {
+    "mcq": ["Score report"],
+    "quiz": ["Quiz score"],
+    "test": ["Test score report"],
+    "recall": ["Marked answer script"],
+
+    "short answer": ["Marked answer script"],
+    "essay": ["Written essay"],
+    "concept": ["Written explanation"],
+
+    "case": ["Case report / assessment form"],
+    "analysis": ["Analysis worksheet"],
+    "critique": ["Written critique"],
+
+    "project": ["Project report"],
+    "proposal": ["Proposal document"],
+
+    "skills": ["Skills checklist"],
+    "osce": ["OSCE score sheet"],
+    "simulation": ["Simulation checklist"],
+
+    "presentation": ["Presentation rubric"],
+    "portfolio": ["Portfolio evidence"],
+    "reflection": ["Reflection journal"]
+}
+
+
+# ======================================================
+# MATCHER
+# ======================================================
+class KeywordAutomaton:
+    # Aho-Corasick over the table keys: matches(text) → indices of every
+    # key occurring in text, the same set as `key in text` per key
+
+    def __init__(self, keys):
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [()]
+
+        for index, key in enumerate(keys):
+            node = 0
+            for ch in key:
+                if ch not in self.goto[node]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append(())
+                    self.goto[node][ch] = len(self.goto) - 1
+                node = self.goto[node][ch]
+            self.out[node] += (index,)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and ch not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(ch, 0)
+                self.out[child] += self.out[self.fail[child]]
+
+    def matches(self, text):
+        found = set()
+        node = 0
+        for ch in text:
+            while node and ch not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(ch, 0)
+            found.update(self.out[node])
+        return found
+
+
+class EvidenceIndex:
+    def __init__(self, mapping, known_names=()):
+        self.keys = list(mapping)
+        self.items = [tuple(mapping[k]) for k in self.keys]
+        self.automaton = KeywordAutomaton(self.keys)
+        self.known = {}
+        for name in known_names:
+            a = name.lower().strip()
+            if a not in self.known:
+                self.known[a] = self.scan(a)
+        self.lookup = lru_cache(maxsize=1024)(self.scan)
+
+    def scan(self, a):
+        evidence = []
+        for index in sorted(self.automaton.matches(a)):
+            evidence.extend(self.items[index])
+        return tuple(dict.fromkeys(evidence)) or NO_EVIDENCE
+
+    def evidence_for(self, assessment):
+        a = assessment.lower().strip()
+        found = self.known.get(a)
+        if found is None:
+            found = self.lookup(a)
+        return list(found)
+
+
+def table_names(table):
+    # every assessment name in a (nested) frozen table
+    if isinstance(table, str):
+        yield table
+        return
+    values = table.values() if hasattr(table, "values") else table
+    for value in values:
+        yield from table_names(value)
+
+
+PROFILE_EVIDENCE = EvidenceIndex(PROFILE_EVIDENCE_MAP, table_names(PROFILE_TABLES))
+FIELD_EVIDENCE = EvidenceIndex(
+    FIELD_EVIDENCE_MAP,
+    table_names((FIELD_COGNITIVE, FIELD_AFFECTIVE, FIELD_PSYCHOMOTOR))
+)
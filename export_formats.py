@@ -0,0 +1,96 @@
+# ======================================================
+# SCLOG — DOWNLOAD FORMATS (XLSX / CSV / NDJSON / JSON)
+# ======================================================
+#
+# Download endpoints take ?format=xlsx|csv|ndjson|json or negotiate it
+# from the Accept header; xlsx stays the default, so browsers and the
+# existing pages are unaffected. The text formats are written row by row
+# straight from the CLO results — no workbook object, nothing held but
+# the current row.
+
+import io
+import csv
+import json
+
+from flask import request, Response, jsonify
+
+EXPORT_TYPES = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json"
+}
+TEXT_FORMATS = ("csv", "ndjson", "json")
+
+
+class ExportFormatError(ValueError):
+    pass
+
+
+def export_format(default="xlsx"):
+    # ?format= wins; otherwise the best Accept match, `default` for */*
+    fmt = request.args.get("format", "").strip().lower()
+    if fmt:
+        if fmt not in EXPORT_TYPES:
+            raise ExportFormatError(f"Unsupported format '{fmt}' — use {', '.join(EXPORT_TYPES)}")
+        return fmt
+
+    offered = [EXPORT_TYPES[default]] + [m for f, m in EXPORT_TYPES.items() if f != default]
+    best = request.accept_mimetypes.best_match(offered, default=EXPORT_TYPES[default])
+    return next(f for f, m in EXPORT_TYPES.items() if m == best)
+
+
+def download_format():
+    # (format, None) or (None, 400 response) for the download endpoints
+    try:
+        return export_format(), None
+    except ExportFormatError as e:
+        return None, (jsonify({"error": str(e)}), 400)
+
+
+# ------------------------------------------------------
+# Row encoders
+# ------------------------------------------------------
+def csv_lines(header, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    writer.writerow(header)
+    yield buffer.getvalue()
+    for row in rows:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def ndjson_lines(header, rows):
+    for row in rows:
+        yield json.dumps(dict(zip(header, row)), ensure_ascii=False, default=str) + "\n"
+
+
+def json_array(header, rows):
+    # one array, streamed element by element
+    yield "["
+    first = True
+    for row in rows:
+        item = json.dumps(dict(zip(header, row)), ensure_ascii=False, default=str)
+        yield ("\n" if first else ",\n") + item
+        first = False
+    yield "\n]\n"
+
+
+ENCODERS = {"csv": csv_lines, "ndjson": ndjson_lines, "json": json_array}
+
+
+def table_response(fmt, header, rows, download_name):
+    # `rows` may be a generator — it is only consumed while the body is sent
+    def body():
+        for text in ENCODERS[fmt](header, rows):
+            yield text.encode("utf-8")
+
+    mimetype = EXPORT_TYPES[fmt]
+    response = Response(body(), mimetype=mimetype)
+    if fmt == "csv":
+        response.headers["Content-Type"] = f"{mimetype}; charset=utf-8"
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}.{fmt}"'
+    return response
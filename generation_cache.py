@@ -0,0 +1,99 @@
+# ======================================================
+# SCLOG — CONTENT-ADDRESSED GENERATION CACHE
+# ======================================================
+#
+# /generate and /clo-only/generate are pure functions of their form
+# fields and the knowledge-base snapshot, so a repeat request is served
+# from here: key = sha256(endpoint, normalised inputs, KB version).
+# The key doubles as the response ETag (and /generate's result id).
+
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+from flask import make_response
+
+from knowledge_base import KB
+
+GENERATION_CACHE_MAX = int(os.environ.get("SCLOG_GENERATION_CACHE_MAX", "2048"))
+
+
+class GenerationCache:
+    def __init__(self, max_items=GENERATION_CACHE_MAX):
+        self.max_items = max_items
+        self._items = OrderedDict()  # key → (result, body bytes)
+        self._lock = threading.Lock()
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def key(self, endpoint, inputs):
+        raw = json.dumps(
+            [KB.snapshot().version, endpoint, inputs],
+            ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _sync(self):
+        # a knowledge-base reload drops everything built from the old one
+        version = KB.snapshot().version
+        if version != self.version:
+            if self._items:
+                self.invalidations += 1
+            self._items.clear()
+            self.version = version
+
+    def get(self, key):
+        with self._lock:
+            self._sync()
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._items.move_to_end(key)
+            return item
+
+    def put(self, key, result, body):
+        with self._lock:
+            self._sync()
+            self._items[key] = (result, body)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_items": self.max_items,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "kb_version": self.version
+            }
+
+
+def generation_response(key, body, hit):
+    # ETag = content digest. Both endpoints are POST, where a matching
+    # If-None-Match would mean 412 rather than 304, so the body always goes
+    # out; the ETag only tells clients two answers are the same bytes
+    response = make_response(body)
+    response.mimetype = "application/json"
+    response.set_etag(key)
+    response.headers["Cache-Control"] = "private, no-cache"
+    response.headers["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+# shared by app.py and server.py
+GENERATION_CACHE = GenerationCache()
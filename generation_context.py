@@ -0,0 +1,270 @@
+# ======================================================
+# SCLOG — MATERIALISED GENERATION CONTEXTS
+# ======================================================
+#
+# Everything in a CLO except the verb and content follows from
+# (profile, PLO, bloom, level): SC, VBE, domain, condition, criterion,
+# allowed blooms, assessments and evidence. Those contexts are built for
+# every combination the knowledge base can produce each time a snapshot
+# loads, so /generate and /clo-only/generate only assemble strings. A key
+# outside the table (odd casing, unknown profile or level) is built on
+# demand by the same functions, so a result never depends on which path
+# served it. IEG, PEO and statements come from the knowledge base's own
+# mapping; a ?programme= mapping replaces just those fields.
+
+import sys
+import time
+import logging
+from collections import namedtuple
+from types import MappingProxyType
+
+from knowledge_base import KB, PROFILE_SHEET_MAP, PLO_MAPPING_DOCUMENT, BLOOM_SHEETS
+from taxonomy import DEGREE_BLOOM_LIMIT, allowed_blooms
+from assessment_tables import (
+    PROFILE_ASSESSMENT, PROFILE_TABLES, BLOOM_ALIASES,
+    assessments_by_profile, assessments_by_field
+)
+from evidence_index import PROFILE_EVIDENCE, FIELD_EVIDENCE
+from conditions import condition_for
+
+log = logging.getLogger(__name__)
+
+LEVELS = tuple(DEGREE_BLOOM_LIMIT["cognitive"])
+
+# /generate — (profile, plo, bloom.lower(), level)
+ProfileContext = namedtuple("ProfileContext", [
+    "sc_code", "sc_desc", "vbe", "domain", "criterion", "condition",
+    "connector", "condition_clean", "allowed", "assessments", "evidence",
+    "peo", "ieg", "peo_statement", "plo_statement", "plo_indicator"
+])
+
+# /clo-only/generate — (plo, bloom, level)
+CloOnlyContext = namedtuple("CloOnlyContext", [
+    "domain", "sc_desc", "vbe", "condition", "allowed",
+    "assessments_by_field", "assessments", "evidence"
+])
+
+
+# ------------------------------------------------------
+# META (Criterion + Condition) — app.get_meta_data / utils.get_meta_data
+# ------------------------------------------------------
+def plo_details(snap, plo, profile):
+    return snap.plo_index.get(snap.mapping_sheet(profile), {}).get(str(plo).upper())
+
+
+def meta_data(snap, plo, bloom, profile="sc"):
+    details = plo_details(snap, plo, profile)
+    if not details:
+        return {}
+
+    domain = (details.get("Domain") or "").lower()
+    criterion, condition = condition_for(snap, domain, bloom)
+
+    connector = "by" if domain == "psychomotor" else "when"
+    return {
+        "sc_code": details["SC_Code"],
+        "sc_desc": details["SC_Desc"],
+        "vbe": details["VBE"],
+        "domain": domain,
+        "criterion": criterion,
+        "condition": f"{connector} {condition}"
+    }
+
+
+# ------------------------------------------------------
+# Context builders
+# ------------------------------------------------------
+def evidence_pairs(index, assessments):
+    return tuple((a, tuple(index.evidence_for(a))) for a in assessments)
+
+
+def programme_fields(graph, front, plo, level):
+    # IEG, PEO and statements — the part of a context a programme mapping
+    # decides (the knowledge base's own, or one from programmes.py)
+    peo = (graph["PLOtoPEO"].get(plo) or [None])[0]
+    return {
+        "peo": peo,
+        "ieg": (graph["PEOtoIEG"].get(peo) or ["Paste IEG"])[0],
+        "peo_statement": front.get("PEOstatements", {}).get(peo, ""),
+        "plo_statement": front["PLOstatements"].get(level, {}).get(plo, "Full MQF-aligned PLO"),
+        "plo_indicator": "; ".join(front.get("PLOindicators", {}).get(level, {}).get(plo, []))
+    }
+
+
+def build_profile_context(snap, profile, plo, bloom, level):
+    # None when the PLO is not on the profile's mapping sheet
+    details = plo_details(snap, plo, profile)
+    if not details:
+        return None
+
+    domain = details["Domain"].lower()
+    criterion, condition = condition_for(snap, domain, bloom)
+    connector = "when" if domain != "psychomotor" else "by"
+    assessments = assessments_by_profile(domain, PROFILE_ASSESSMENT.get(profile, profile), bloom)
+
+    return ProfileContext(
+        sc_code=details["SC_Code"],
+        sc_desc=details["SC_Desc"],
+        vbe=details["VBE"],
+        domain=details["Domain"],
+        criterion=criterion,
+        condition=f"{connector} {condition}",
+        connector=connector,
+        condition_clean=condition,
+        allowed=tuple(allowed_blooms(domain, level)),
+        assessments=assessments,
+        evidence=evidence_pairs(PROFILE_EVIDENCE, assessments),
+        **programme_fields(snap.graph, snap.front, plo, level)
+    )
+
+
+def build_clo_only_context(snap, plo, bloom, level):
+    # None when the PLO is not in plo_mapping.json
+    details = snap.document(PLO_MAPPING_DOCUMENT).get(plo)
+    if not details:
+        return None
+
+    domain = details["domain"].lower()
+
+    # the condition follows the PLO's domain on the sc mapping sheet
+    sc_details = plo_details(snap, plo, "sc")
+    if sc_details:
+        _, condition = condition_for(snap, sc_details["Domain"], bloom)
+    else:
+        condition = "evaluating information from multiple sources"
+
+    by_field = assessments_by_field(domain, bloom)
+    flat = tuple(sorted(set(a for items in by_field.values() for a in items)))
+
+    return CloOnlyContext(
+        domain=domain,
+        sc_desc=details["sc_description"],
+        vbe=details["vbe"],
+        condition=condition,
+        allowed=tuple(allowed_blooms(domain, level)),
+        assessments_by_field=by_field,
+        assessments=flat,
+        evidence=evidence_pairs(FIELD_EVIDENCE, flat)
+    )
+
+
+# ------------------------------------------------------
+# Materialised table (one per knowledge-base snapshot)
+# ------------------------------------------------------
+def domain_blooms(snap):
+    # every bloom key (lower-case) a request can carry, per domain
+    blooms = {domain: set() for domain in BLOOM_SHEETS}
+    for domain, bloom in snap.criterion_index:
+        blooms.setdefault(domain, set()).add(bloom)
+    for domain, sheet in BLOOM_SHEETS.items():
+        blooms[domain].update(level.lower() for level in snap.bloom_index[sheet]["levels"])
+    for domain, profiles in PROFILE_TABLES.items():
+        for table in profiles.values():
+            blooms[domain].update(table)
+    for domain, levels in DEGREE_BLOOM_LIMIT.items():
+        for names in levels.values():
+            blooms[domain].update(b.lower() for b in names)
+    for alias, bloom in BLOOM_ALIASES.items():
+        for names in blooms.values():
+            if bloom in names:
+                names.add(alias)
+    return blooms
+
+
+def deep_sizeof(obj, seen):
+    # shared objects (tuples from the frozen tables) are counted once
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (dict, MappingProxyType)):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (tuple, list, set)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    return size
+
+
+def compact(ctx, pool):
+    # equal field values (one condition or statement repeated for every
+    # level and profile) are stored once
+    if ctx is None:
+        return None
+    return ctx._make(pool.setdefault(v, v) if isinstance(v, (str, tuple)) else v for v in ctx)
+
+
+def build_contexts(snap):
+    started = time.perf_counter()
+    blooms = domain_blooms(snap)
+    pool = {}
+
+    profile = {}
+    for name in PROFILE_SHEET_MAP:
+        for plo, details in snap.plo_index.get(snap.mapping_sheet(name), {}).items():
+            for bloom in blooms.get(details["Domain"].lower(), ()):
+                for level in LEVELS:
+                    profile[(name, plo, bloom, level)] = compact(
+                        build_profile_context(snap, name, plo, bloom, level), pool
+                    )
+
+    clo_only = {}
+    for plo, details in snap.document(PLO_MAPPING_DOCUMENT).items():
+        if not isinstance(details, dict) or "domain" not in details:
+            continue
+        for bloom in blooms.get(str(details["domain"]).lower(), ()):
+            for level in LEVELS:
+                clo_only[(plo, bloom, level)] = compact(
+                    build_clo_only_context(snap, plo, bloom, level), pool
+                )
+
+    build_ms = (time.perf_counter() - started) * 1000
+    seen = set()
+    stats = {
+        "version": snap.version,
+        "profile_contexts": len(profile),
+        "clo_only_contexts": len(clo_only),
+        "build_ms": round(build_ms, 1),
+        "bytes": deep_sizeof(profile, seen) + deep_sizeof(clo_only, seen)
+    }
+    log.info(
+        "Generation contexts for %s: %d + %d in %.1f ms, ~%d KiB",
+        snap.version, len(profile), len(clo_only), build_ms, stats["bytes"] // 1024
+    )
+    return {"profile": profile, "clo_only": clo_only, "stats": stats}
+
+
+KB.derive("contexts", build_contexts)
+
+
+# ------------------------------------------------------
+# Lookups
+# ------------------------------------------------------
+def profile_context(profile, plo, bloom, level, programme=None):
+    # `programme` (a programmes.ProgrammeMapping) swaps its IEG, PEO and
+    # statements into the table's context; the result is kept on the
+    # mapping per snapshot, so it is keyed by programme and KB version
+    snap = KB.snapshot()
+    key = (profile, plo, bloom.lower(), level)
+    contexts = KB.derived("contexts", snap)["profile"]
+    ctx = contexts[key] if key in contexts else build_profile_context(snap, *key)
+    if ctx is None or programme is None or programme.source == "kb":
+        return ctx
+
+    table = programme.contexts.get(snap.version)
+    if table is None:
+        table = {}
+        programme.contexts = {snap.version: table}
+    if key not in table:
+        table[key] = ctx._replace(**programme_fields(programme.graph, programme.front, plo, level))
+    return table[key]
+
+
+def clo_only_context(plo, bloom, level):
+    key = (plo, bloom, level)
+    contexts = KB.derived("contexts")["clo_only"]
+    if key in contexts:
+        return contexts[key]
+    return build_clo_only_context(KB.snapshot(), *key)
+
+
+def context_stats():
+    return KB.derived("contexts")["stats"]
@@ -0,0 +1,48 @@
+# ======================================================
+# SCLOG — CONDITIONAL GET (ETAG FROM KNOWLEDGE-BASE VERSION)
+# ======================================================
+
+import os
+import hashlib
+from functools import wraps
+
+from flask import request, make_response
+
+from knowledge_base import KB
+
+MAX_AGE = int(os.environ.get("SCLOG_HTTP_MAX_AGE", "60"))
+
+
+def kb_etag(*parts):
+    # strong validator: same knowledge-base version + same URL → same bytes
+    raw = ":".join([KB.snapshot().version, request.full_path] + [str(p) for p in parts])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def cache_headers(response, etag, max_age=MAX_AGE, vary=()):
+    response.set_etag(etag)
+    for header in vary:
+        response.vary.add(header)
+    response.headers["Cache-Control"] = f"public, max-age={max_age}, must-revalidate"
+    return response
+
+
+def kb_conditional(max_age=MAX_AGE, parts=None, vary=()):
+    # For GET endpoints whose payload only changes with the knowledge base:
+    # answer If-None-Match with 304 before the view runs at all. `parts()`
+    # adds validators for data outside the snapshot (a programme mapping);
+    # `vary` names the request headers `parts()` reads, sent on 200 and 304.
+    def decorator(view):
+        @wraps(view)
+        def wrapped(*args, **kwargs):
+            etag = kb_etag(*(parts() if parts else ()))
+            # weak comparison (RFC 9110): proxies that gzip mark ETags W/
+            if request.if_none_match.contains_weak(etag):
+                return cache_headers(make_response("", 304), etag, max_age, vary)
+
+            response = make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                cache_headers(response, etag, max_age, vary)
+            return response
+        return wrapped
+    return decorator
@@ -0,0 +1,325 @@
+# ======================================================
+# SCLOG — BACKGROUND EXPORT JOBS (BOUNDED POOL + SQLITE JOB TABLE)
+# ======================================================
+#
+# Workbook builders run on a small thread pool instead of the request
+# thread. Every job is a row in a SQLite table shared by all workers on
+# the host and its output a file next to it, so a job submitted to one
+# gunicorn worker can be polled and downloaded through any other:
+#
+#   POST /api/jobs                {"kind": "...", "params": {...}} → 202
+#   GET  /api/jobs/<id>           status + progress
+#   GET  /api/jobs/<id>/result    the file, once status is "done"
+#
+#   SCLOG_JOB_WORKERS      concurrent jobs per worker process (2)
+#   SCLOG_JOB_QUEUE_MAX    queued + running jobs per process before 503 (64)
+#   SCLOG_JOB_RETENTION    seconds a finished job and its file are kept (86400)
+#   SCLOG_JOB_INLINE_WAIT  seconds a download endpoint waits for its job
+#                          before answering 202 with the job instead (1.5)
+
+import os
+import json
+import time
+import uuid
+import socket
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import jsonify, send_file, url_for
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+JOB_DB = os.environ.get("SCLOG_JOB_DB", os.path.join(BASE_DIR, "instance", "sclog_jobs.db"))
+JOB_DIR = os.environ.get("SCLOG_JOB_DIR", os.path.join(BASE_DIR, "instance", "jobs"))
+JOB_WORKERS = int(os.environ.get("SCLOG_JOB_WORKERS", "2"))
+JOB_QUEUE_MAX = int(os.environ.get("SCLOG_JOB_QUEUE_MAX", "64"))
+JOB_RETENTION = int(os.environ.get("SCLOG_JOB_RETENTION", "86400"))
+JOB_INLINE_WAIT = float(os.environ.get("SCLOG_JOB_INLINE_WAIT", "1.5"))
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+PROGRESS_INTERVAL = 0.5     # seconds between progress writes
+SWEEP_INTERVAL = 60
+
+JOB_FIELDS = (
+    "id", "kind", "status", "progress", "total", "error", "filename",
+    "mimetype", "size", "owner", "created_at", "started_at", "finished_at"
+)
+
+
+class JobError(ValueError):
+    pass
+
+
+class JobQueueFull(RuntimeError):
+    pass
+
+
+class JobKind:
+    def __init__(self, build, prepare=None, mimetype=XLSX_MIMETYPE):
+        self.build = build          # build(params, out, progress) → download name
+        self.prepare = prepare      # prepare(params) → params to store; raises JobError
+        self.mimetype = mimetype
+
+
+def owner_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def owner_alive(owner):
+    # a job whose process is gone will never finish
+    host, _, pid = (owner or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True     # another host's job — cannot tell, assume alive
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+class JobQueue:
+    def __init__(self, db_path=JOB_DB, result_dir=JOB_DIR, workers=JOB_WORKERS,
+                 queue_max=JOB_QUEUE_MAX, retention=JOB_RETENTION):
+        self.db_path = db_path
+        self.result_dir = result_dir
+        self.workers = workers
+        self.queue_max = queue_max
+        self.retention = retention
+        self.kinds = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._pool = None
+        self._pool_pid = None
+        self._pending = 0
+        self._events = {}           # job id → Event, for jobs run by this process
+        self._swept_at = 0.0
+        self._ready = False
+
+    # --------------------------------------------------
+    # Storage
+    # --------------------------------------------------
+    def _connect(self):
+        # sqlite3 connections must stay on the thread that opened them;
+        # the table is created on first use, not at import
+        db = getattr(self._local, "db", None)
+        if db is None:
+            if not self._ready:
+                os.makedirs(self.result_dir, exist_ok=True)
+                directory = os.path.dirname(self.db_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.db_path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if not self._ready:
+                with db:
+                    db.execute(
+                        "CREATE TABLE IF NOT EXISTS jobs ("
+                        " id TEXT PRIMARY KEY,"
+                        " kind TEXT NOT NULL,"
+                        " status TEXT NOT NULL,"
+                        " params TEXT NOT NULL,"
+                        " progress INTEGER NOT NULL DEFAULT 0,"
+                        " total INTEGER NOT NULL DEFAULT 0,"
+                        " error TEXT,"
+                        " filename TEXT,"
+                        " mimetype TEXT,"
+                        " size INTEGER,"
+                        " owner TEXT,"
+                        " created_at REAL NOT NULL,"
+                        " started_at REAL,"
+                        " finished_at REAL)"
+                    )
+                    db.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+                self._ready = True
+            self._local.db = db
+        return db
+
+    def _update(self, job_id, **fields):
+        columns = ", ".join(f"{name} = ?" for name in fields)
+        with self._connect() as db:
+            db.execute(f"UPDATE jobs SET {columns} WHERE id = ?", (*fields.values(), job_id))
+
+    def result_path(self, job_id):
+        return os.path.join(self.result_dir, job_id)
+
+    # --------------------------------------------------
+    # Kinds
+    # --------------------------------------------------
+    def register(self, kind, build, prepare=None, mimetype=XLSX_MIMETYPE):
+        self.kinds[kind] = JobKind(build, prepare, mimetype)
+
+    # --------------------------------------------------
+    # Pool — one per process, started on first submit
+    # --------------------------------------------------
+    def _executor(self):
+        pid = os.getpid()
+        if self._pool_pid != pid:
+            # forked gunicorn worker: the parent's pool threads do not exist here
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sclog-job")
+            self._pool_pid = pid
+            self._pending = 0
+            self._events = {}
+        return self._pool
+
+    def submit(self, kind, params):
+        job_kind = self.kinds.get(kind)
+        if job_kind is None:
+            raise JobError(f"Unknown job kind '{kind}'")
+        params = job_kind.prepare(params) if job_kind.prepare else params
+
+        self.sweep()
+        with self._lock:
+            pool = self._executor()
+            if self._pending >= self.queue_max:
+                raise JobQueueFull(f"{self._pending} jobs already queued")
+            self._pending += 1
+
+            job_id = uuid.uuid4().hex
+            with self._connect() as db:
+                db.execute(
+                    "INSERT INTO jobs (id, kind, status, params, owner, created_at)"
+                    " VALUES (?, ?, 'queued', ?, ?, ?)",
+                    (job_id, kind, json.dumps(params, ensure_ascii=False), owner_id(), time.time())
+                )
+            self._events[job_id] = threading.Event()
+            pool.submit(self._run, job_id, job_kind, params)
+        return self.get(job_id)
+
+    def _run(self, job_id, job_kind, params):
+        path = self.result_path(job_id)
+        last = [0.0]
+
+        def progress(done, total):
+            now = time.monotonic()
+            if done >= total or now - last[0] >= PROGRESS_INTERVAL:
+                last[0] = now
+                self._update(job_id, progress=int(done), total=int(total))
+
+        try:
+            self._update(job_id, status="running", started_at=time.time())
+            with open(path + ".part", "wb") as out:
+                filename = job_kind.build(params, out, progress)
+            os.replace(path + ".part", path)
+            self._update(
+                job_id, status="done", filename=filename, mimetype=job_kind.mimetype,
+                size=os.path.getsize(path), finished_at=time.time()
+            )
+        except Exception as e:
+            log.exception("Job %s failed", job_id)
+            try:
+                os.remove(path + ".part")
+            except OSError:
+                pass
+            self._update(job_id, status="failed", error=str(e) or type(e).__name__,
+                         finished_at=time.time())
+        finally:
+            with self._lock:
+                self._pending -= 1
+                event = self._events.pop(job_id, None)
+            if event is not None:
+                event.set()
+
+    # --------------------------------------------------
+    # Status
+    # --------------------------------------------------
+    def get(self, job_id):
+        row = self._connect().execute(
+            f"SELECT {', '.join(JOB_FIELDS)} FROM jobs WHERE id = ?", (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = dict(zip(JOB_FIELDS, row))
+        if job["status"] in ("queued", "running") and not owner_alive(job["owner"]):
+            job.update(status="failed", error="Worker exited before the job finished",
+                       finished_at=time.time())
+            self._update(job_id, status=job["status"], error=job["error"],
+                         finished_at=job["finished_at"])
+        return job
+
+    def wait(self, job_id, timeout):
+        # only jobs run by this process can be waited on without polling
+        event = self._events.get(job_id)
+        if event is not None:
+            event.wait(timeout)
+        return self.get(job_id)
+
+    # --------------------------------------------------
+    # Retention
+    # --------------------------------------------------
+    def sweep(self, force=False):
+        now = time.time()
+        if not force and now - self._swept_at < SWEEP_INTERVAL:
+            return 0
+        self._swept_at = now
+        cutoff = now - self.retention
+        with self._connect() as db:
+            expired = [r[0] for r in db.execute(
+                "SELECT id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            )]
+            db.executemany("DELETE FROM jobs WHERE id = ?", [(i,) for i in expired])
+        for job_id in expired:
+            try:
+                os.remove(self.result_path(job_id))
+            except OSError:
+                pass
+        return len(expired)
+
+    def stats(self):
+        counts = dict(self._connect().execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"))
+        return {
+            "workers": self.workers,
+            "queue_max": self.queue_max,
+            "retention": self.retention,
+            "pending_here": self._pending if self._pool_pid == os.getpid() else 0,
+            "jobs": counts
+        }
+
+
+# ------------------------------------------------------
+# Flask helpers
+# ------------------------------------------------------
+def job_payload(job):
+    payload = {k: job[k] for k in JOB_FIELDS if k != "owner"}
+    payload["status_url"] = url_for("job_status", job_id=job["id"])
+    if job["status"] == "done":
+        payload["result_url"] = url_for("job_result", job_id=job["id"])
+    return payload
+
+
+def job_file(job):
+    return send_file(
+        JOBS.result_path(job["id"]),
+        as_attachment=True,
+        download_name=job["filename"],
+        mimetype=job["mimetype"]
+    )
+
+
+def job_download(kind, params, wait=JOB_INLINE_WAIT):
+    # the download endpoints: run on the pool, send the file when it is
+    # ready within `wait` seconds, otherwise 202 + the job to poll
+    try:
+        job = JOBS.submit(kind, params)
+    except JobError as e:
+        return jsonify({"error": str(e)}), 400
+    except JobQueueFull as e:
+        return jsonify({"error": f"Export queue full ({e}) — try again shortly"}), 503, {"Retry-After": "5"}
+
+    job = JOBS.wait(job["id"], wait)
+    if job["status"] == "done":
+        return job_file(job)
+    if job["status"] == "failed":
+        return jsonify({"error": job["error"], "job": job_payload(job)}), 500
+    return jsonify(job_payload(job)), 202, {"Location": url_for("job_status", job_id=job["id"])}
+
+
+# shared by app.py's /api/jobs routes and every download endpoint
+JOBS = JobQueue()
@@ -0,0 +1,597 @@
+# ======================================================
+# SCLOG — KNOWLEDGE BASE (WORKBOOK SNAPSHOT + COMPILED ARTIFACT)
+# ======================================================
+#
+# Build the artifact after editing the workbook or the JSON files:
+#
+#     python knowledge_base.py build
+#
+# Workers load SCLOG.kb at boot without importing pandas/openpyxl and fall
+# back to parsing the xlsx when the artifact is missing or stale. A
+# background watcher rebuilds the snapshot when the workbook or any
+# static/data/*.json file changes and swaps it in atomically.
+
+import os
+import sys
+import json
+import math
+import hashlib
+import logging
+import threading
+import time
+import zlib
+from contextvars import ContextVar
+from datetime import datetime
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WORKBOOK_PATH = os.path.join(BASE_DIR, "SCLOG (1).xlsx")
+DATA_DIR = os.path.join(BASE_DIR, "static", "data")
+ARTIFACT_PATH = os.path.join(BASE_DIR, "SCLOG.kb")
+
+# Bump when the artifact layout changes — older artifacts are then stale.
+# The payload is zlib-compressed JSON: loading it never runs code.
+ARTIFACT_MAGIC = b"SCLOGKB"
+ARTIFACT_FORMAT = 2
+
+PROFILE_SHEET_MAP = {
+    "health": "Mapping_health",
+    "sc": "Mapping_sc",
+    "eng": "Mapping_eng",
+    "socs": "Mapping_socs",
+    "edu": "Mapping_edu",
+    "bus": "Mapping_bus",
+    "arts": "Mapping_arts"
+}
+
+BLOOM_SHEETS = {
+    "cognitive": "Bloom_Cognitive",
+    "affective": "Bloom_Affective",
+    "psychomotor": "Bloom_Psychomotor"
+}
+
+FRONT_DOCUMENT = "SCLOG_front.json"
+PLO_MAPPING_DOCUMENT = "plo_mapping.json"
+FRONT_DEFAULT_KEYS = {
+    "IEGs": [], "PEOs": [], "PLOs": [],
+    "IEGtoPEO": {}, "PEOtoPLO": {},
+    "PLOstatements": {}, "PEOstatements": {},
+    "PLOtoVBE": {}, "PLOIndicators": {},
+    "SCmapping": {}
+}
+
+WATCH_INTERVAL = float(os.environ.get("SCLOG_KB_WATCH_INTERVAL", "2"))
+
+
+# ------------------------------------------------------
+# Snapshot of every sheet in the workbook
+# ------------------------------------------------------
+class WorkbookSnapshot:
+    def __init__(self, stamp, sources, tables, documents, source="xlsx"):
+        self.stamp = stamp            # ((path, (mtime_ns, size)), ...) of watched files
+        self.tables = tables          # {sheet name: {"columns": [...], "rows": [[...]]}}
+        self.documents = documents    # {json file name: parsed JSON}
+        self.source = source          # "artifact" or "xlsx"
+        self.loaded_at = time.time()
+        self.derived = {}             # {name: table built by a KB.derive() builder}
+
+        # content-derived, so every worker agrees on the version
+        self.version = hashlib.sha1(
+            json.dumps(sorted(sources.items())).encode("utf-8")
+        ).hexdigest()[:12]
+
+        front = dict(documents.get(FRONT_DOCUMENT) or {})
+        for k, v in FRONT_DEFAULT_KEYS.items():
+            front.setdefault(k, v)
+        self.front = front
+        self.graph = build_mapping_graph(front)
+
+        # lookup indexes — built once so requests never scan a sheet
+        self.plo_index = {
+            name: build_plo_index(table)
+            for name, table in tables.items()
+            if str(name).startswith("Mapping")
+        }
+        # which sheets exist, recorded once per version — a profile whose
+        # sheet is missing resolves straight to its fallback, never to a miss
+        self.sheet_names = {sheet_key(name): name for name in tables}
+        self.profile_sheets = {
+            profile: self.resolve_mapping_sheet(sheet)
+            for profile, sheet in PROFILE_SHEET_MAP.items()
+        }
+        self.default_mapping_sheet = self.resolve_mapping_sheet("Mapping")
+
+        self.criterion_index = build_criterion_index(tables.get("Criterion"))
+        self.bloom_index = {
+            name: build_bloom_index(tables.get(name))
+            for name in BLOOM_SHEETS.values()
+        }
+
+    def resolve_mapping_sheet(self, name):
+        # exact or whitespace/case-insensitive match ("Mapping_socs "), then
+        # "Mapping"; None when neither has any rows
+        real = self.sheet_names.get(sheet_key(name))
+        if real is not None and self.plo_index.get(real):
+            return real
+        real = self.sheet_names.get(sheet_key("Mapping"))
+        if real is not None and self.plo_index.get(real):
+            return real
+        return None
+
+    def mapping_sheet(self, profile):
+        if profile in self.profile_sheets:
+            return self.profile_sheets[profile]
+        return self.default_mapping_sheet
+
+    def sheet(self, name):
+        # pandas is only imported by callers that still want a DataFrame
+        import pandas as pd
+
+        table = self.tables.get(name)
+        if table is None:
+            return pd.DataFrame()
+        return pd.DataFrame(table["rows"], columns=table["columns"])
+
+    def document(self, name):
+        return self.documents.get(name, {})
+
+
+# ------------------------------------------------------
+# Index builders (plain tables, no pandas)
+# ------------------------------------------------------
+def sheet_key(name):
+    return str(name).strip().lower()
+
+
+def cell_text(value):
+    return "" if value is None else str(value)
+
+
+def build_plo_index(table):
+    # {PLO code (upper): details} — first row wins, like df[mask].iloc[0]
+    index = {}
+    if not table or not table["rows"]:
+        return index
+
+    columns = [str(c).strip() for c in table["columns"]]
+    for values in table["rows"]:
+        row = dict(zip(columns, values))
+        key = cell_text(values[0]).upper()
+        if key in index:
+            continue
+        index[key] = {
+            "SC_Code": cell_text(row.get("SC Code", row.get("SCCode", ""))),
+            "SC_Desc": cell_text(row.get("SC Description", row.get("SCDescription", ""))),
+            "VBE": cell_text(row.get("VBE", "")),
+            "Domain": cell_text(row.get("Domain", ""))
+        }
+    return index
+
+
+def build_mapping_graph(front):
+    # forward IEG→PEO→PLO edges from SCLOG_front.json plus their reverse
+    # and the transitive PLO→IEG; lists keep the JSON order, so the first
+    # entry is what a scan of the forward map would have found first
+    def reverse(forward):
+        index = {}
+        for source, targets in forward.items():
+            for target in targets or []:
+                index.setdefault(target, [])
+                if source not in index[target]:
+                    index[target].append(source)
+        return index
+
+    ieg_peo = front.get("IEGtoPEO") or {}
+    peo_plo = front.get("PEOtoPLO") or {}
+    plo_peo = reverse(peo_plo)
+    peo_ieg = reverse(ieg_peo)
+
+    plo_ieg = {}
+    for plo, peos in plo_peo.items():
+        iegs = plo_ieg.setdefault(plo, [])
+        for peo in peos:
+            iegs.extend(i for i in peo_ieg.get(peo, []) if i not in iegs)
+
+    return {
+        "IEGtoPEO": ieg_peo,
+        "PEOtoPLO": peo_plo,
+        "PLOtoPEO": plo_peo,
+        "PEOtoIEG": peo_ieg,
+        "PLOtoIEG": plo_ieg
+    }
+
+
+def build_criterion_index(table):
+    # {(domain, bloom): (criterion, condition)} from the Criterion sheet
+    index = {}
+    if not table:
+        return index
+
+    for values in table["rows"]:
+        key = (cell_text(values[0]).lower(), cell_text(values[1]).lower())
+        if key in index:
+            continue
+        criterion = cell_text(values[2]) if len(values) > 2 else ""
+        condition = cell_text(values[3]) if len(values) > 3 else ""
+        index[key] = (criterion, condition)
+    return index
+
+
+def build_bloom_index(table):
+    # {"levels": [...], "verbs": {bloom (lower): [verbs]}} for a Bloom_* sheet
+    index = {"levels": [], "verbs": {}}
+    if not table or "Bloom Level" not in table["columns"]:
+        return index
+
+    col = table["columns"].index("Bloom Level")
+    for values in table["rows"]:
+        level = values[col]
+        if level is not None:
+            index["levels"].append(str(level).strip())
+
+        # Column 2 = verbs
+        key = cell_text(level).lower()
+        if key in index["verbs"] or len(values) < 2:
+            continue
+        index["verbs"][key] = [v.strip() for v in cell_text(values[1]).split(",") if v.strip()]
+    return index
+
+
+# ------------------------------------------------------
+# Source files
+# ------------------------------------------------------
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def plain_value(value):
+    # DataFrame cell → JSON type, so the artifact loads without pandas;
+    # dates and times become the text cell_text() would have made of them
+    if value is None:
+        return None
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if hasattr(value, "to_pydatetime"):
+        return str(value.to_pydatetime())
+    if hasattr(value, "item"):
+        value = value.item()
+        if isinstance(value, float) and math.isnan(value):
+            return None
+    if not isinstance(value, (str, int, float, bool)):
+        return str(value)
+    return value
+
+
+def parse_workbook(path):
+    if not os.path.exists(path):
+        return {}
+
+    import pandas as pd
+
+    try:
+        frames = pd.read_excel(path, sheet_name=None, engine="openpyxl")
+    except Exception:
+        return {}
+
+    return {
+        name: {
+            "columns": [str(c) for c in df.columns],
+            "rows": [[plain_value(v) for v in row] for row in df.itertuples(index=False)]
+        }
+        for name, df in frames.items()
+    }
+
+
+def json_documents(data_dir):
+    try:
+        return sorted(n for n in os.listdir(data_dir) if n.endswith(".json"))
+    except OSError:
+        return []
+
+
+def load_documents(data_dir):
+    documents = {}
+    for name in json_documents(data_dir):
+        try:
+            with open(os.path.join(data_dir, name), "r", encoding="utf-8") as f:
+                documents[name] = json.load(f)
+        except (OSError, ValueError):
+            documents[name] = {}
+    return documents
+
+
+def source_digests(workbook_path, data_dir):
+    sources = {os.path.basename(workbook_path): file_digest(workbook_path)}
+    for name in json_documents(data_dir):
+        sources[name] = file_digest(os.path.join(data_dir, name))
+    return sources
+
+
+def source_stamps(workbook_path, data_dir):
+    paths = [workbook_path] + [os.path.join(data_dir, n) for n in json_documents(data_dir)]
+    return tuple((path, file_stamp(path)) for path in paths)
+
+
+# ------------------------------------------------------
+# Compiled artifact
+# ------------------------------------------------------
+def build_artifact(workbook_path=WORKBOOK_PATH, data_dir=DATA_DIR, artifact_path=ARTIFACT_PATH):
+    payload = {
+        "format": ARTIFACT_FORMAT,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+        "sources": source_digests(workbook_path, data_dir),
+        "tables": parse_workbook(workbook_path),
+        "documents": load_documents(data_dir)
+    }
+    blob = ARTIFACT_MAGIC + zlib.compress(
+        json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9
+    )
+
+    # write-then-rename so a running worker never reads half an artifact
+    tmp_path = artifact_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, artifact_path)
+    return payload
+
+
+def load_artifact(artifact_path, sources):
+    # returns the payload, or None when the artifact is missing or stale
+    # (built from files whose digests differ from `sources`)
+    try:
+        with open(artifact_path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+
+    if not blob.startswith(ARTIFACT_MAGIC):
+        return None
+    try:
+        payload = json.loads(zlib.decompress(blob[len(ARTIFACT_MAGIC):]))
+    except (zlib.error, ValueError):
+        return None
+
+    if not isinstance(payload, dict) or payload.get("format") != ARTIFACT_FORMAT:
+        return None
+    if payload.get("sources") != sources:
+        return None
+    return payload
+
+
+class KnowledgeBase:
+    """Serves the workbook and JSON files from one in-memory snapshot.
+
+    The snapshot comes from the compiled artifact when it matches the
+    source files, otherwise from parsing the xlsx. Once start_watcher() has
+    run, changes are picked up by a background thread and requests never
+    wait on a re-parse; without it, the snapshot is checked inline.
+    """
+
+    def __init__(self, workbook_path=WORKBOOK_PATH, data_dir=DATA_DIR, artifact_path=ARTIFACT_PATH):
+        self.workbook_path = workbook_path
+        self.data_dir = data_dir
+        self.artifact_path = artifact_path
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._pinned = ContextVar(f"kb_pinned_{id(self)}", default=None)
+        self._watcher_pid = None
+        self._derivations = {}
+
+    def load(self):
+        snap = self.read_snapshot()
+        for name, builder in self._derivations.items():
+            snap.derived[name] = builder(snap)
+        return snap
+
+    def read_snapshot(self):
+        stamp = source_stamps(self.workbook_path, self.data_dir)
+        sources = source_digests(self.workbook_path, self.data_dir)
+
+        payload = load_artifact(self.artifact_path, sources)
+        if payload is not None:
+            return WorkbookSnapshot(stamp, sources, payload["tables"], payload["documents"], "artifact")
+
+        return WorkbookSnapshot(
+            stamp,
+            sources,
+            parse_workbook(self.workbook_path),
+            load_documents(self.data_dir)
+        )
+
+    def snapshot(self):
+        pinned = self._pinned.get()
+        if pinned is not None:
+            return pinned
+
+        snap = self._snapshot
+        if snap is not None and (
+            self.watching() or snap.stamp == source_stamps(self.workbook_path, self.data_dir)
+        ):
+            return snap
+
+        with self._lock:
+            snap = self._snapshot
+            if snap is None or (
+                not self.watching()
+                and snap.stamp != source_stamps(self.workbook_path, self.data_dir)
+            ):
+                snap = self.load()
+                self._snapshot = snap
+        return snap
+
+    # --------------------------------------------------
+    # Per-request pinning — one consistent version per request
+    # --------------------------------------------------
+    def pin(self, snap=None):
+        # `snap` lets a streamed response keep the version its request began with
+        return self._pinned.set(snap or self.snapshot())
+
+    def unpin(self, token):
+        self._pinned.reset(token)
+
+    # --------------------------------------------------
+    # Background watcher + atomic swap
+    # --------------------------------------------------
+    def watching(self):
+        return self._watcher_pid == os.getpid()
+
+    def start_watcher(self, interval=WATCH_INTERVAL):
+        # safe to call per request: starts at most one thread per process,
+        # and again in each forked gunicorn worker
+        if self.watching():
+            return
+        with self._lock:
+            if self.watching():
+                return
+            self._watcher_pid = os.getpid()
+
+        thread = threading.Thread(
+            target=self._watch, args=(interval,), name="kb-watcher", daemon=True
+        )
+        thread.start()
+
+    def _watch(self, interval):
+        while True:
+            time.sleep(interval)
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("Knowledge base reload failed; keeping version %s",
+                              self._snapshot.version if self._snapshot else "-")
+
+    def refresh(self):
+        current = self._snapshot
+        stamp = source_stamps(self.workbook_path, self.data_dir)
+        if current is not None and current.stamp == stamp:
+            return current
+
+        snap = self.load()
+        if os.path.exists(self.workbook_path) and not snap.tables:
+            # half-saved workbook — keep serving the old snapshot, retry next poll
+            return current
+
+        self._snapshot = snap   # single reference swap
+        log.info("Knowledge base reloaded: version %s from %s", snap.version, snap.source)
+        return snap
+
+    # --------------------------------------------------
+    # Derived tables — rebuilt with every snapshot
+    # --------------------------------------------------
+    def derive(self, name, builder):
+        # builder(snapshot) runs whenever a snapshot loads, so tables that
+        # depend on modules this one must not import (assessment rules,
+        # evidence tables) are built off the request path and swapped in
+        # with the snapshot they came from
+        self._derivations[name] = builder
+        snap = self._snapshot
+        if snap is not None and name not in snap.derived:
+            snap.derived[name] = builder(snap)
+
+    def derived(self, name, snap=None):
+        # `snap` for builders that read another derived table of the
+        # snapshot being loaded (not yet the current one)
+        snap = snap or self.snapshot()
+        if name not in snap.derived:
+            snap.derived[name] = self._derivations[name](snap)
+        return snap.derived[name]
+
+    def load_df(self, sheet_name):
+        return self.snapshot().sheet(sheet_name)
+
+    def document(self, name):
+        return self.snapshot().document(name)
+
+    def front_map(self):
+        return self.snapshot().front
+
+    def plo_mapping(self):
+        return self.snapshot().document(PLO_MAPPING_DOCUMENT)
+
+    # --------------------------------------------------
+    # O(1) lookups
+    # --------------------------------------------------
+    def mapping_sheet(self, profile):
+        return self.snapshot().mapping_sheet(profile)
+
+    def plo_details(self, plo, profile="sc"):
+        snap = self.snapshot()
+        index = snap.plo_index.get(snap.mapping_sheet(profile), {})
+
+        details = index.get(str(plo).upper())
+        return dict(details) if details else None
+
+    def criterion(self, domain, bloom):
+        return self.snapshot().criterion_index.get(
+            (str(domain).lower(), str(bloom).lower()), ("", "")
+        )
+
+    def plo_peos(self, plo):
+        return list(self.snapshot().graph["PLOtoPEO"].get(plo, []))
+
+    def peo_iegs(self, peo):
+        return list(self.snapshot().graph["PEOtoIEG"].get(peo, []))
+
+    def plo_iegs(self, plo):
+        return list(self.snapshot().graph["PLOtoIEG"].get(plo, []))
+
+    def bloom_levels(self, domain):
+        sheet = BLOOM_SHEETS.get(domain)
+        if not sheet:
+            return []
+        return list(self.snapshot().bloom_index[sheet]["levels"])
+
+    def bloom_verbs(self, bloom):
+        # Bloom taxonomy is domain-based — try every Bloom sheet in turn
+        key = str(bloom).strip().lower()
+        for sheet in BLOOM_SHEETS.values():
+            verbs = self.snapshot().bloom_index[sheet]["verbs"].get(key)
+            if verbs is not None:
+                return list(verbs)
+        return []
+
+
+# ------------------------------------------------------
+# Shared instance — app.py, utils.py and the clo_only blueprint all read
+# through this one cache
+# ------------------------------------------------------
+KB = KnowledgeBase()
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SCLOG knowledge-base tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="compile the workbook + JSON files into SCLOG.kb")
+    build.add_argument("--workbook", default=WORKBOOK_PATH)
+    build.add_argument("--data-dir", default=DATA_DIR)
+    build.add_argument("--output", default=ARTIFACT_PATH)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        started = time.perf_counter()
+        payload = build_artifact(args.workbook, args.data_dir, args.output)
+        print(
+            f"Wrote {args.output} ({os.path.getsize(args.output)} bytes, "
+            f"{len(payload['tables'])} sheets, {len(payload['documents'])} JSON files) "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        sys.exit(0)
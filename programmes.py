@@ -0,0 +1,275 @@
+# ======================================================
+# SCLOG — MULTI-PROGRAMME MAPPING REGISTRY
+# ======================================================
+#
+# One deployment can serve many programmes: each has its own
+# IEG → PEO → PLO mapping in PROGRAMME_DIR as <id>.json (the
+# SCLOG_front.json layout) or a compiled <id>.map:
+#
+#     python programmes.py build
+#
+# Mappings load on first use and stay in an LRU bounded by item count and
+# approximate bytes. A request without ?programme= (or "default") gets the
+# knowledge base's own SCLOG_front.json, exactly as before.
+
+import os
+import re
+import sys
+import json
+import time
+import logging
+import threading
+import zlib
+from collections import OrderedDict
+
+from knowledge_base import KB, BASE_DIR, FRONT_DEFAULT_KEYS, build_mapping_graph
+from generation_context import deep_sizeof
+
+log = logging.getLogger(__name__)
+
+PROGRAMME_DIR = os.environ.get("SCLOG_PROGRAMME_DIR", os.path.join(BASE_DIR, "programmes"))
+PROGRAMME_CACHE_MAX = int(os.environ.get("SCLOG_PROGRAMME_CACHE_MAX", "32"))
+PROGRAMME_CACHE_BYTES = int(os.environ.get("SCLOG_PROGRAMME_CACHE_MB", "64")) * 1024 * 1024
+
+DEFAULT_PROGRAMME = "default"
+PROGRAMME_ID_RE = re.compile(r"^[A-Za-z0-9][A-Za-z0-9_.-]{0,63}$")
+
+# Bump when the compiled layout changes — older .map files are then ignored.
+# A .map is zlib-compressed JSON, so loading one never runs code.
+MAP_MAGIC = b"SCLOGMAP"
+MAP_FORMAT = 2
+
+
+class UnknownProgramme(LookupError):
+    pass
+
+
+# ------------------------------------------------------
+# One programme's mapping
+# ------------------------------------------------------
+class ProgrammeMapping:
+    def __init__(self, programme, front, stamp, source):
+        front = dict(front or {})
+        for k, v in FRONT_DEFAULT_KEYS.items():
+            front.setdefault(k, v)
+
+        self.programme = programme
+        self.front = front
+        self.graph = build_mapping_graph(front)
+        self.stamp = stamp            # stamps of <id>.json and <id>.map when loaded
+        self.source = source          # "json", "map" or "kb"
+        self.loaded_at = time.time()
+        self.contexts = {}            # {KB version: {key: context}} — generation_context
+        self.bytes = deep_sizeof(front, set()) + deep_sizeof(self.graph, set())
+
+    @property
+    def version(self):
+        # cheap validator for ETags: changes whenever the file is replaced
+        return ":".join([self.programme] + [str(part) for part in self.stamp])
+
+
+# ------------------------------------------------------
+# Source files
+# ------------------------------------------------------
+def valid_programme_id(programme):
+    return bool(PROGRAMME_ID_RE.match(programme)) and ".." not in programme
+
+
+def file_stamp(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def programme_paths(directory, programme):
+    base = os.path.join(directory, programme)
+    return base + ".json", base + ".map"
+
+
+def compile_programme(json_path, map_path):
+    # <id>.json → <id>.map; the JSON's stamp is recorded so an edited
+    # source is never shadowed by an old compiled file
+    with open(json_path, "r", encoding="utf-8") as f:
+        front = json.load(f)
+    payload = {"format": MAP_FORMAT, "source_stamp": file_stamp(json_path), "front": front}
+    blob = MAP_MAGIC + zlib.compress(
+        json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), 9
+    )
+
+    tmp_path = map_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(blob)
+    os.replace(tmp_path, map_path)
+    return payload
+
+
+def load_compiled(map_path, json_stamp):
+    # front mapping from <id>.map, or None when missing, unreadable or stale
+    try:
+        with open(map_path, "rb") as f:
+            blob = f.read()
+    except OSError:
+        return None
+    if not blob.startswith(MAP_MAGIC):
+        return None
+    try:
+        payload = json.loads(zlib.decompress(blob[len(MAP_MAGIC):]))
+    except (zlib.error, ValueError):
+        return None
+    if not isinstance(payload, dict) or payload.get("format") != MAP_FORMAT:
+        return None
+    if json_stamp is not None and tuple(payload.get("source_stamp") or ()) != json_stamp:
+        return None
+    front = payload.get("front")
+    return front if isinstance(front, dict) else None
+
+
+def programme_stamp(directory, programme):
+    return tuple(file_stamp(path) for path in programme_paths(directory, programme))
+
+
+def read_programme(directory, programme):
+    json_path, map_path = programme_paths(directory, programme)
+    stamp = programme_stamp(directory, programme)
+    json_stamp = stamp[0]
+
+    front = load_compiled(map_path, json_stamp)
+    if front is not None:
+        return ProgrammeMapping(programme, front, stamp, "map")
+
+    if json_stamp is None:
+        raise UnknownProgramme(programme)
+    try:
+        with open(json_path, "r", encoding="utf-8") as f:
+            front = json.load(f)
+    except (OSError, ValueError):
+        raise UnknownProgramme(programme)
+    return ProgrammeMapping(programme, front, stamp, "json")
+
+
+# ------------------------------------------------------
+# Registry (lazy load + LRU)
+# ------------------------------------------------------
+class ProgrammeRegistry:
+    def __init__(self, directory=PROGRAMME_DIR, max_items=PROGRAMME_CACHE_MAX,
+                 max_bytes=PROGRAMME_CACHE_BYTES):
+        self.directory = directory
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()   # programme id → ProgrammeMapping
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    def available(self):
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return []
+        ids = {os.path.splitext(n)[0] for n in names if n.endswith((".json", ".map"))}
+        return sorted(i for i in ids if valid_programme_id(i))
+
+    def get(self, programme=None):
+        programme = (programme or "").strip()
+        if not programme or programme == DEFAULT_PROGRAMME:
+            return self.default()
+        if not valid_programme_id(programme):
+            raise UnknownProgramme(programme)
+
+        with self._lock:
+            item = self._items.get(programme)
+            if item is not None:
+                # replaced on disk → drop and reload below
+                if programme_stamp(self.directory, programme) == item.stamp:
+                    self._items.move_to_end(programme)
+                    return item
+                self._discard(programme)
+
+        # parse outside the lock; two racing loads of one id are harmless
+        item = read_programme(self.directory, programme)
+        log.info("Programme %s loaded from %s (~%d KiB)", programme, item.source, item.bytes // 1024)
+
+        with self._lock:
+            self.loads += 1
+            if programme in self._items:
+                self._discard(programme)
+            self._items[programme] = item
+            self._bytes += item.bytes
+            self._evict()
+        return item
+
+    def default(self):
+        return KB.derived("programme")
+
+    def _discard(self, programme):
+        item = self._items.pop(programme)
+        self._bytes -= item.bytes
+
+    def _evict(self):
+        # the newest entry always stays, even when it alone is over budget
+        while len(self._items) > 1 and (
+            len(self._items) > self.max_items or self._bytes > self.max_bytes
+        ):
+            programme, item = self._items.popitem(last=False)
+            self._bytes -= item.bytes
+            self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "loaded": list(self._items),
+                "bytes": self._bytes,
+                "max_items": self.max_items,
+                "max_bytes": self.max_bytes,
+                "loads": self.loads,
+                "evictions": self.evictions
+            }
+
+
+# the knowledge base's own mapping, versioned with its snapshot
+KB.derive("programme", lambda snap: ProgrammeMapping(
+    DEFAULT_PROGRAMME, snap.front, (snap.version,), "kb"
+))
+
+
+# ------------------------------------------------------
+# Shared instance
+# ------------------------------------------------------
+PROGRAMMES = ProgrammeRegistry()
+
+
+# ------------------------------------------------------
+# CLI
+# ------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SCLOG programme mapping tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="compile every <id>.json in the programme directory to <id>.map")
+    build.add_argument("--dir", default=PROGRAMME_DIR)
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        built = 0
+        for name in sorted(os.listdir(args.dir)):
+            programme, ext = os.path.splitext(name)
+            if ext != ".json" or not valid_programme_id(programme):
+                continue
+            json_path, map_path = programme_paths(args.dir, programme)
+            compile_programme(json_path, map_path)
+            built += 1
+            print(f"{programme}: {os.path.getsize(map_path)} bytes")
+        print(f"Compiled {built} programme mapping(s) in {args.dir}")
+        sys.exit(0)
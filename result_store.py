@@ -0,0 +1,167 @@
+# ======================================================
+# SCLOG — GENERATED-CLO RESULT STORE (BOUNDED LRU + TTL)
+# ======================================================
+#
+# /generate keeps each result under an id that the download endpoints
+# take back, instead of a process-global "last CLO". Two backends:
+#
+#   SCLOG_RESULT_STORE=memory                    per-process, single worker
+#   SCLOG_RESULT_STORE=sqlite:///path/results.db shared by every worker on
+#                                                the host (default, under
+#                                                instance/)
+
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from collections import OrderedDict
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+RESULT_STORE_URL = os.environ.get(
+    "SCLOG_RESULT_STORE",
+    "sqlite:///" + os.path.join(BASE_DIR, "instance", "sclog_results.db")
+)
+RESULT_MAX = int(os.environ.get("SCLOG_RESULT_MAX", "1000"))
+RESULT_TTL = int(os.environ.get("SCLOG_RESULT_TTL", "3600"))
+
+
+def new_result_id():
+    return uuid.uuid4().hex
+
+
+# ------------------------------------------------------
+# In-process backend
+# ------------------------------------------------------
+class MemoryResultStore:
+    def __init__(self, max_items=RESULT_MAX, ttl=RESULT_TTL):
+        self.max_items = max_items
+        self.ttl = ttl
+        self._items = OrderedDict()  # id → (stored_at, result)
+        self._lock = threading.Lock()
+
+    def put(self, result, result_id=None):
+        result_id = result_id or new_result_id()
+        with self._lock:
+            self._items[result_id] = (time.time(), result)
+            self._items.move_to_end(result_id)
+            self._evict()
+        return result_id
+
+    def get(self, result_id):
+        with self._lock:
+            item = self._items.get(result_id)
+            if item is None:
+                return None
+            if time.time() - item[0] > self.ttl:
+                del self._items[result_id]
+                return None
+            self._items.move_to_end(result_id)
+            return item[1]
+
+    def _evict(self):
+        cutoff = time.time() - self.ttl
+        while self._items:
+            oldest_id, (stored_at, _) = next(iter(self._items.items()))
+            if len(self._items) <= self.max_items and stored_at >= cutoff:
+                break
+            del self._items[oldest_id]
+
+    def __len__(self):
+        return len(self._items)
+
+
+# ------------------------------------------------------
+# SQLite backend — one file shared by all workers on the host
+# ------------------------------------------------------
+class SQLiteResultStore:
+    def __init__(self, path, max_items=RESULT_MAX, ttl=RESULT_TTL):
+        self.path = path
+        self.max_items = max_items
+        self.ttl = ttl
+        self._local = threading.local()
+        self._ready = False
+
+    def _connect(self):
+        # sqlite3 connections must stay on the thread that opened them;
+        # the directory and table are created on first use, not at import
+        db = getattr(self._local, "db", None)
+        if db is None:
+            if not self._ready:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            if not self._ready:
+                with db:
+                    db.execute(
+                        "CREATE TABLE IF NOT EXISTS results ("
+                        " id TEXT PRIMARY KEY,"
+                        " payload TEXT NOT NULL,"
+                        " stored_at REAL NOT NULL,"
+                        " used_at REAL NOT NULL)"
+                    )
+                    db.execute("CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)")
+                self._ready = True
+            self._local.db = db
+        return db
+
+    def put(self, result, result_id=None):
+        result_id = result_id or new_result_id()
+        now = time.time()
+        payload = json.dumps(result, ensure_ascii=False)
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO results (id, payload, stored_at, used_at)"
+                " VALUES (?, ?, ?, ?)",
+                (result_id, payload, now, now)
+            )
+            self._evict(db, now)
+        return result_id
+
+    def get(self, result_id):
+        # reads stay reads: used_at (the LRU order) is only moved on when it
+        # is older than a tenth of the TTL, so downloads and exports do not
+        # turn every lookup into a write other workers queue behind
+        now = time.time()
+        db = self._connect()
+        row = db.execute(
+            "SELECT payload, stored_at, used_at FROM results WHERE id = ?", (result_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        if now - row[1] > self.ttl:
+            with db:
+                db.execute("DELETE FROM results WHERE id = ?", (result_id,))
+            return None
+        if now - row[2] > self.ttl / 10:
+            with db:
+                db.execute("UPDATE results SET used_at = ? WHERE id = ?", (now, result_id))
+        return json.loads(row[0])
+
+    def _evict(self, db, now):
+        db.execute("DELETE FROM results WHERE stored_at < ?", (now - self.ttl,))
+        db.execute(
+            "DELETE FROM results WHERE id IN ("
+            " SELECT id FROM results ORDER BY used_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_items,)
+        )
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+
+def open_result_store(url=RESULT_STORE_URL):
+    if url == "memory":
+        return MemoryResultStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteResultStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unknown SCLOG_RESULT_STORE '{url}'")
+
+
+# shared by app.py's generate/download routes
+RESULTS = open_result_store()
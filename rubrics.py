@@ -0,0 +1,190 @@
+# ======================================================
+# SCLOG — CLO RUBRICS (LIBRARY FROM conditions_db + TAXONOMY)
+# ======================================================
+#
+# Level descriptors (Excellent / Good / Satisfactory / Poor) are built
+# once per knowledge-base snapshot for every (domain, bloom) from the
+# condition table (conditions_db.CONDITION_MAP, Criterion sheet wins) and
+# taxonomy.BLOOM_DESCRIPTIONS. A rubric is then a lookup: one CLO for
+# /download_rubric and /clo-only/download-rubric, or one row per CLO for
+# course packs and /api/export/rubrics, written in a single pass.
+
+import re
+import time
+import logging
+
+from assessment_tables import bloom_key
+from conditions import condition_for
+from coverage import record_course
+from conditions_db import CONDITION_MAP
+from knowledge_base import KB
+from taxonomy import BLOOM_DESCRIPTIONS
+
+log = logging.getLogger(__name__)
+
+RUBRIC_HEADER = ["Component", "Description"]
+RUBRIC_LEVELS = ("Excellent", "Good", "Satisfactory", "Poor")
+
+# one row per CLO: the many-CLO workbook and the text formats
+RUBRICS_HEADER = ["No.", "Course", "PLO", "Domain", "Bloom", "CLO", "Focus"] + list(RUBRIC_LEVELS)
+
+# levels grade how consistently the criterion is met and how fully the
+# Bloom level (with its taxonomy description) is shown
+LEVEL_TEMPLATES = (
+    "Consistently works {criterion} {condition}; fully demonstrates the {bloom} level{focus}.",
+    "Mostly works {criterion} {condition}, with minor lapses; clearly demonstrates the {bloom} level{focus}.",
+    "Sometimes works {criterion} {condition}; partly demonstrates the {bloom} level{focus}.",
+    "Rarely works {criterion} {condition}; does not yet demonstrate the {bloom} level{focus}."
+)
+
+# CLOs whose domain / bloom the library does not know
+GENERIC_LEVELS = (
+    "Performs at excellent level",
+    "Performs well",
+    "Meets minimum level",
+    "Below expected"
+)
+
+# conditions_db names some affective levels by verb, taxonomy by gerund
+DESCRIPTION_KEYS = {"receive": "receiving", "respond": "responding", "value": "valuing"}
+
+# conditions that already open with a preposition take no connector, and
+# criteria that do ("with openness", "under supervision") are adverbial
+PREPOSITIONS = (
+    "during", "throughout", "in", "within", "under", "while", "after", "before", "with", "without"
+)
+
+# the levels grade consistency themselves ("consistently and sincerely")
+CONSISTENTLY_RE = re.compile(r"\bconsistently(?:\s+and\b)?\s*")
+
+
+# ------------------------------------------------------
+# Library
+# ------------------------------------------------------
+def criterion_phrase(criterion):
+    # adverbs ("critically", "clearly and coherently") and prepositional
+    # phrases read after "works"; anything else is an adjective
+    # ("controlled") → "in a controlled manner"
+    criterion = CONSISTENTLY_RE.sub("", criterion).strip()
+    if not criterion:
+        return ""
+    first = criterion.split(" ", 1)[0].lower()
+    if first.endswith("ly") or first in PREPOSITIONS:
+        return criterion
+    return f"in a {criterion} manner"
+
+
+def condition_phrase(domain, condition):
+    if not condition or condition.split(" ", 1)[0] in PREPOSITIONS:
+        return condition
+    connector = "by" if domain == "psychomotor" else "when"
+    return f"{connector} {condition}"
+
+
+def build_descriptors(snap, domain, bloom):
+    criterion, condition = condition_for(snap, domain, bloom)
+    name = DESCRIPTION_KEYS.get(bloom, bloom)
+    description = BLOOM_DESCRIPTIONS.get(domain, {})
+    focus = description.get(bloom) or description.get(name, "")
+    values = {
+        "bloom": name,
+        "focus": f" ({focus.rstrip('.')[:1].lower()}{focus.rstrip('.')[1:]})" if focus else "",
+        "criterion": criterion_phrase(criterion),
+        "condition": condition_phrase(domain, condition)
+    }
+    levels = tuple(
+        " ".join(t.format(**values).split()).replace(" ;", ";").replace(" ,", ",")
+        for t in LEVEL_TEMPLATES
+    )
+    return focus, levels
+
+
+def build_rubric_library(snap):
+    # {(domain, bloom): (focus, (excellent, good, satisfactory, poor))} for
+    # every bloom named in CONDITION_MAP, the taxonomy or the Criterion sheet
+    started = time.perf_counter()
+    keys = set(KB.derived("conditions", snap))
+    for source in (CONDITION_MAP, BLOOM_DESCRIPTIONS):
+        keys.update((domain, bloom) for domain, blooms in source.items() for bloom in blooms)
+
+    library = {key: build_descriptors(snap, *key) for key in keys}
+    log.info(
+        "Rubric library for %s: %d descriptors in %.1f ms",
+        snap.version, len(library), (time.perf_counter() - started) * 1000
+    )
+    return library
+
+
+KB.derive("rubrics", build_rubric_library)
+
+
+def clo_domain_bloom(clo):
+    # /generate results carry domain / bloom at the top, /clo-only in meta
+    meta = clo.get("meta") if isinstance(clo.get("meta"), dict) else {}
+    domain = str(clo.get("domain") or meta.get("domain") or "").strip().lower()
+    bloom = bloom_key(str(clo.get("bloom") or meta.get("bloom") or ""))
+    return domain, bloom
+
+
+def rubric_for(clo):
+    # → (focus, level descriptors) for the CLO's domain and bloom
+    return KB.derived("rubrics").get(clo_domain_bloom(clo)) or ("", GENERIC_LEVELS)
+
+
+# ------------------------------------------------------
+# One CLO
+# ------------------------------------------------------
+def rubric_rows(clo, label="Indicator", text="Ability to {clo}"):
+    # /download_rubric; /clo-only/download-rubric heads it ["CLO", clo]
+    focus, levels = rubric_for(clo)
+    rows = [[label, text.format(clo=clo.get("clo", ""))]]
+    if focus:
+        rows.append(["Bloom Focus", focus])
+    return rows + [[level, text] for level, text in zip(RUBRIC_LEVELS, levels)]
+
+
+def write_rubric_workbook(clo, out):
+    from openpyxl import Workbook
+
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Rubric"
+
+    ws.append(RUBRIC_HEADER)
+    for row in rubric_rows(clo):
+        ws.append(row)
+
+    wb.save(out)
+
+
+# ------------------------------------------------------
+# Many CLOs — one row each
+# ------------------------------------------------------
+def rubric_table_rows(clos):
+    # the library is fetched once, so each row is two dict lookups
+    library = KB.derived("rubrics")
+    for number, clo in enumerate(clos, start=1):
+        domain, bloom = clo_domain_bloom(clo)
+        focus, levels = library.get((domain, bloom)) or ("", GENERIC_LEVELS)
+        yield [
+            number, record_course(clo), clo.get("plo", ""), domain, bloom, clo.get("clo", ""), focus
+        ] + list(levels)
+
+
+def write_rubrics_workbook(clos, out):
+    # many CLOs, one write-only sheet, one pass over `clos`
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Rubrics")
+    ws.append(RUBRICS_HEADER)
+    count = 0
+    try:
+        for row in rubric_table_rows(clos):
+            ws.append(row)
+            count = row[0]
+    finally:
+        ws.close()
+
+    wb.save(out)
+    return count
@@ -1,21 +1,28 @@
-from flask import Blueprint, request, jsonify, send_file, current_app, send_from_directory
-from openpyxl import Workbook
-from io import BytesIO
+from flask import Blueprint, request, jsonify
 from datetime import datetime
-import os
-import json
+
+from knowledge_base import KB
+from http_cache import kb_conditional
+from generation_cache import GENERATION_CACHE, generation_response
+from jobs import JOBS, JobError, job_download
+from export_formats import download_format, table_response
+from course_export import CLO_TABLE_HEADER, clo_rows
+from rubrics import rubric_rows
 
 def load_plo_mapping():
-    path = os.path.join(current_app.root_path, "static", "data", "plo_mapping.json")
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    # plo_mapping.json lives in the shared knowledge-base snapshot
+    return KB.plo_mapping()
 
 
 from utils import (
-    get_meta_data,
-    get_assessment,
-    get_evidence_for
+    CLOInputError,
+    field,
+    memo,
+    result_records
 )
+from streaming import stream_format, stream_records
+from taxonomy import BLOOM_DESCRIPTIONS
+from generation_context import clo_only_context
 
 
 # ======================================================
@@ -24,70 +31,15 @@ from utils import (
 clo_only = Blueprint("clo_only", __name__)
 
 @clo_only.route("/clo-only/plo-mapping")
+@kb_conditional()
 def serve_plo_mapping():
-    return send_from_directory(
-        os.path.join(current_app.root_path, "static", "data"),
-        "plo_mapping.json"
-    )
-
-# ======================================================
-# DEGREE × DOMAIN × BLOOM LIMIT
-# ======================================================
-DEGREE_BLOOM_LIMIT = {
-    "cognitive": {
-        "Diploma": ["remember", "understand", "apply"],
-        "Degree": ["apply", "analyze", "analyse", "evaluate"],
-        "Master": ["analyze", "analyse", "evaluate", "create"],
-        "PhD": ["evaluate", "create"]
-    },
-    "affective": {
-    "Diploma": ["receiving", "responding"],
-    "Degree": ["responding", "valuing"],
-    "Master": ["valuing", "organization"],
-    "PhD": ["organization", "characterization"]
-    },
-    "psychomotor": {
-        "Diploma": ["perception", "set", "guided response"],
-        "Degree": ["guided response", "mechanism"],
-        "Master": ["complex overt response", "adaptation"],
-        "PhD": ["adaptation", "origination"]
-    }
-}
-
-# ======================================================
-# BLOOM DESCRIPTIONS (UI EXPLANATION)
-# ======================================================
-BLOOM_DESCRIPTIONS = {
-    "cognitive": {
-        "remember": "Recall relevant knowledge from long-term memory.",
-        "understand": "Construct meaning from instructional messages.",
-        "apply": "Use procedures to perform tasks or solve problems.",
-        "analyze": "Break material into parts and determine relationships.",
-        "evaluate": "Make judgments based on criteria and standards.",
-        "create": "Put elements together to form a novel structure."
-    },
-    "affective": {
-        "receiving": "Willingness to listen and be aware of values.",
-        "responding": "Active participation through response or compliance.",
-        "valuing": "Attach worth or value to behaviours or ideas.",
-        "organization": "Integrate values into a coherent system.",
-        "characterization": "Consistent value-driven behaviour."
-    },
-    "psychomotor": {
-        "perception": "Use sensory cues to guide motor activity.",
-        "set": "Readiness to act based on mental and physical disposition.",
-        "guided response": "Early stage of skill acquisition with guidance.",
-        "mechanism": "Intermediate stage of skill proficiency.",
-        "complex overt response": "Skilled performance of complex movements.",
-        "adaptation": "Modify movements to fit special situations.",
-        "origination": "Create new movement patterns."
-    }
-}
+    return jsonify(load_plo_mapping())
 
 # ======================================================
 # API — BLOOM DESCRIPTION
 # ======================================================
 @clo_only.route("/api/clo-only/bloom-desc/<plo>/<bloom>")
+@kb_conditional()
 def bloom_desc(plo, bloom):
     plo_map = load_plo_mapping()
     details = plo_map.get(plo)
@@ -103,65 +55,34 @@ def bloom_desc(plo, bloom):
 # ======================================================
 # API — GENERATE CLO (FULL QUALITY)
 # ======================================================
-@clo_only.route("/clo-only/generate", methods=["POST"])
-def clo_only_generate():
-    data = request.form
-
-    plo = data.get("plo", "")
-    bloom = (data.get("bloom_key") or data.get("bloom", "")).strip().lower()
-    verb = data.get("verb", "")
-    content = data.get("content", "")
-    level = data.get("level", "Degree")
+def build_clo_only(data, cache=None):
+    plo = field(data, "plo")
+    bloom = (field(data, "bloom_key") or field(data, "bloom")).strip().lower()
+    verb = field(data, "verb")
+    content = field(data, "content")
+    level = field(data, "level", "Degree")
 
     # -------------------------
     # REQUIRED FIELD CHECK
     # -------------------------
     if not all([plo, bloom, verb, content]):
-        return jsonify({"error": "Missing required fields"}), 400
+        raise CLOInputError("Missing required fields")
 
     # -------------------------
     # SINGLE SOURCE OF TRUTH — PLO
+    # (SC, VBE, condition, assessments and evidence are precomputed
+    # per (PLO, bloom, level) from plo_mapping.json)
     # -------------------------
-    plo_map = load_plo_mapping()
-    details = plo_map.get(plo)
+    ctx = memo(cache, ("context", plo, bloom, level), clo_only_context, plo, bloom, level)
 
-    if not details:
-        return jsonify({"error": "Invalid PLO"}), 400
-
-    domain = details["domain"].lower()
-    sc_desc = details["sc_description"]
-    vbe = details["vbe"]
-
-    # -------------------------
-    # CONDITION (SAFE + ACADEMIC)
-    # -------------------------
-    meta = get_meta_data(plo, bloom, "sc") or {}
-
-    raw_condition = meta.get(
-        "condition",
-        "evaluating information from multiple sources"
-    )
-
-    condition = (
-        raw_condition
-        .replace("when ", "")
-        .replace("by ", "")
-        .replace("guided by", "")
-        .replace("applying analyze level cognitive processes", "evaluating information from multiple sources")
-        .replace("applying evaluate level cognitive processes", "making judgments based on criteria")
-        .replace("applying create level cognitive processes", "synthesising ideas into new solutions")
-        .strip()
-    )
+    if ctx is None:
+        raise CLOInputError("Invalid PLO")
 
     # -------------------------
     # DEGREE × BLOOM ENFORCEMENT
     # -------------------------
-    allowed = [b.lower() for b in DEGREE_BLOOM_LIMIT.get(domain, {}).get(level, [])]
-    if bloom not in allowed:
-        return jsonify({
-            "error": f"Bloom '{bloom}' not allowed for {level} ({domain})",
-            "allowed": allowed
-        }), 400
+    if bloom not in ctx.allowed:
+        raise CLOInputError(f"Bloom '{bloom}' not allowed for {level} ({ctx.domain})", list(ctx.allowed))
 
     # -------------------------
     # CLEAN VERB DUPLICATION
@@ -174,8 +95,8 @@ def clo_only_generate():
     # CLO CONSTRUCTION ✅
     # -------------------------
     clo = (
-        f"{verb.lower()} {content} using {sc_desc.lower()} "
-        f"when {condition} guided by {vbe.lower()}."
+        f"{verb.lower()} {content} using {ctx.sc_desc.lower()} "
+        f"when {ctx.condition} guided by {ctx.vbe.lower()}."
     ).capitalize()
 
     variants = {
@@ -183,59 +104,89 @@ def clo_only_generate():
         "Short": f"{verb.capitalize()} {content}."
     }
 
-
-    # =========================
-    # ASSESSMENT (BY FIELD)
-    # =========================
-    assessments_by_field = get_assessment(plo, bloom, domain)
-
-    # =========================
-    # FLATTEN UNTUK FRONTEND
-    # =========================
-    flat_assessments = sorted(
-        set(
-            a
-            for items in assessments_by_field.values()
-            for a in items
-        )
-    )
-
-    # =========================
-    # EVIDENCE (FIELD-AGNOSTIC)
-    # =========================
-    evidence = {
-        a: get_evidence_for(a)
-        for a in flat_assessments
-    }
-
-    return jsonify({
+    return {
         "clo": clo,
+        "plo": plo,
         "variants": variants,
         "meta": {
-            "domain": domain,
+            "domain": ctx.domain,
             "bloom": bloom,
-            "sc": sc_desc,
-            "vbe": vbe,
-            "condition": condition
+            "sc": ctx.sc_desc,
+            "vbe": ctx.vbe,
+            "condition": ctx.condition
         },
 
         # ✅ FRONTEND SELAMAT
-        "assessments": flat_assessments,
-        "evidence": evidence,
+        "assessments": ctx.assessments,
+        "evidence": dict(ctx.evidence),
 
         # ✅ UNTUK SEMUA ORANG NAMPAK CONTOH FIELD
-        "assessments_by_field": assessments_by_field
+        "assessments_by_field": dict(ctx.assessments_by_field)
+    }
+
+
+def clo_only_inputs(data):
+    # the fields build_clo_only reads, normalised the way it does
+    return {
+        "plo": field(data, "plo"),
+        "bloom": (field(data, "bloom_key") or field(data, "bloom")).strip().lower(),
+        "verb": field(data, "verb"),
+        "content": field(data, "content"),
+        "level": field(data, "level", "Degree")
+    }
+
+
+@clo_only.route("/clo-only/generate", methods=["POST"])
+def clo_only_generate():
+    key = GENERATION_CACHE.key("clo-only", clo_only_inputs(request.form))
+    cached = GENERATION_CACHE.get(key)
+    if cached:
+        return generation_response(key, cached[1], hit=True)
+
+    try:
+        result = build_clo_only(request.form)
+    except CLOInputError as e:
+        return jsonify(e.payload()), 400
+
+    body = jsonify(result).get_data()
+    GENERATION_CACHE.put(key, result, body)
+    return generation_response(key, body, hit=False)
+
+
+# ======================================================
+# API — GENERATE CLO (BATCH / STREAMED)
+# ======================================================
+@clo_only.route("/clo-only/generate/batch", methods=["POST"])
+def clo_only_generate_batch():
+    # JSON array of {"plo", "bloom", "verb", "content", "level"} rows;
+    # ?stream=ndjson|sse streams one record per row
+    rows = request.get_json(silent=True)
+    if isinstance(rows, dict):
+        rows = rows.get("rows")
+    if not isinstance(rows, list):
+        return jsonify({"error": "Expected a JSON array of rows"}), 400
+
+    records = result_records(rows, build_clo_only)
+
+    fmt = stream_format()
+    if fmt:
+        return stream_records(records, fmt)
+
+    results = list(records)
+    failed = sum(1 for r in results if not r["ok"])
+    return jsonify({
+        "count": len(rows),
+        "generated": len(rows) - failed,
+        "failed": failed,
+        "results": results
     })
 
     
 # ======================================================
-# DOWNLOAD — CLO EXCEL
+# DOWNLOAD — CLO EXCEL (built on the export job pool)
 # ======================================================
-@clo_only.route("/clo-only/download", methods=["POST"])
-def download_clo():
-    data = request.json
-    if not data:
-        return "No data", 400
+def write_clo_only_workbook(data, out):
+    from openpyxl import Workbook
 
     wb = Workbook()
     ws = wb.active
@@ -260,44 +211,82 @@ def download_clo():
     for a in data.get("assessments", []):
         ws.append([a, ", ".join(data["evidence"].get(a, []))])
 
-    out = BytesIO()
     wb.save(out)
-    out.seek(0)
 
-    return send_file(
-        out,
-        as_attachment=True,
-        download_name=f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
 
-# ======================================================
-# DOWNLOAD — RUBRIC EXCEL
-# ======================================================
-@clo_only.route("/clo-only/download-rubric", methods=["POST"])
-def download_rubric():
+def clo_only_rubric_params(data):
+    if not isinstance(data, dict) or not data.get("clo"):
+        raise JobError("No data")
+    return data
+
+
+def clo_only_job_params(data):
+    data = clo_only_rubric_params(data)
+    if not isinstance(data.get("meta"), dict):
+        raise JobError("CLO payload has no meta")
+    return data
+
+
+def clo_only_job(data, out, progress):
+    write_clo_only_workbook(data, out)
+    return f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+@clo_only.route("/clo-only/download", methods=["POST"])
+def download_clo():
     data = request.json
     if not data:
         return "No data", 400
+    fmt, error = download_format()
+    if error:
+        return error
+    if fmt != "xlsx":
+        name = f"CLO_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        return table_response(fmt, CLO_TABLE_HEADER, clo_rows([data]), name)
+    return job_download("clo-only", data)
+
+# ======================================================
+# DOWNLOAD — RUBRIC EXCEL
+# ======================================================
+RUBRIC_HEADER = ["Criteria", "Description"]
+
+
+def clo_only_rubric_rows(data):
+    return rubric_rows(data, label="CLO", text="{clo}")
+
+
+def write_clo_only_rubric(data, out):
+    from openpyxl import Workbook
 
     wb = Workbook()
     ws = wb.active
     ws.title = "Rubric"
 
-    ws.append(["Criteria", "Description"])
-    ws.append(["CLO", data.get("clo", "")])
-    ws.append(["Excellent", "Exceeds expected performance"])
-    ws.append(["Good", "Meets expected performance"])
-    ws.append(["Satisfactory", "Meets minimum requirement"])
-    ws.append(["Poor", "Below acceptable level"])
+    ws.append(RUBRIC_HEADER)
+    for row in clo_only_rubric_rows(data):
+        ws.append(row)
 
-    out = BytesIO()
     wb.save(out)
-    out.seek(0)
 
-    return send_file(
-        out,
-        as_attachment=True,
-        download_name=f"CLO_Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx",
-        mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-    )
+
+def clo_only_rubric_job(data, out, progress):
+    write_clo_only_rubric(data, out)
+    return f"CLO_Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}.xlsx"
+
+
+JOBS.register("clo-only", clo_only_job, clo_only_job_params)
+JOBS.register("clo-only-rubric", clo_only_rubric_job, clo_only_rubric_params)
+
+
+@clo_only.route("/clo-only/download-rubric", methods=["POST"])
+def download_rubric():
+    data = request.json
+    if not data:
+        return "No data", 400
+    fmt, error = download_format()
+    if error:
+        return error
+    if fmt != "xlsx":
+        name = f"CLO_Rubric_{datetime.now().strftime('%Y%m%d_%H%M')}"
+        return table_response(fmt, RUBRIC_HEADER, clo_only_rubric_rows(data), name)
+    return job_download("clo-only-rubric", data)
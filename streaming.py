@@ -0,0 +1,198 @@
+# ======================================================
+# SCLOG — NDJSON / SERVER-SENT EVENTS / STREAMED FILE OUTPUT
+# ======================================================
+
+import os
+import json
+import queue
+import threading
+
+from flask import request, Response, stream_with_context
+
+from knowledge_base import KB
+
+STREAM_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream"
+}
+
+
+def stream_format():
+    # ?stream=ndjson|sse wins; otherwise honour the Accept header
+    fmt = request.args.get("stream", "").strip().lower()
+    if fmt in STREAM_TYPES:
+        return fmt
+
+    accept = request.accept_mimetypes
+    for fmt, mimetype in STREAM_TYPES.items():
+        if accept.best == mimetype:
+            return fmt
+    return None
+
+
+def encode(record):
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":"))
+
+
+def counted(records, totals):
+    for record in records:
+        totals["count"] += 1
+        if record.get("ok"):
+            totals["generated"] += 1
+        else:
+            totals["failed"] += 1
+        yield record
+
+
+def stream_records(records, fmt):
+    # one line/event per row as soon as it is built, then a summary —
+    # nothing but the current row is held in memory
+    totals = {"count": 0, "generated": 0, "failed": 0}
+
+    # the request's teardown unpins before the body is iterated, so the
+    # stream re-pins the version the request started with
+    snap = KB.snapshot()
+
+    def pinned(body):
+        token = KB.pin(snap)
+        try:
+            yield from body
+        finally:
+            KB.unpin(token)
+
+    def ndjson():
+        for record in counted(records, totals):
+            yield encode(record) + "\n"
+        yield encode({"summary": totals}) + "\n"
+
+    def sse():
+        for record in counted(records, totals):
+            yield f"event: row\ndata: {encode(record)}\n\n"
+        yield f"event: summary\ndata: {encode(totals)}\n\n"
+
+    body = ndjson() if fmt == "ndjson" else sse()
+    return Response(
+        stream_with_context(pinned(body)),
+        mimetype=STREAM_TYPES[fmt],
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+# ------------------------------------------------------
+# Streamed files — a writer thread feeds the response
+# ------------------------------------------------------
+STREAM_CHUNK_BYTES = int(os.environ.get("SCLOG_STREAM_CHUNK_KB", "64")) * 1024
+STREAM_QUEUE_CHUNKS = int(os.environ.get("SCLOG_STREAM_QUEUE_CHUNKS", "16"))
+
+_DONE = object()
+
+
+class StreamCancelled(Exception):
+    pass
+
+
+class ChunkPipe:
+    # write-only, unseekable file object: writes are cut into chunks and
+    # handed over through a bounded queue, so a slow client holds the
+    # writer back instead of letting the output pile up in memory
+
+    def __init__(self, chunk_bytes=STREAM_CHUNK_BYTES, max_chunks=STREAM_QUEUE_CHUNKS):
+        self.chunk_bytes = chunk_bytes
+        self.queue = queue.Queue(maxsize=max_chunks)
+        self.buffer = bytearray()
+        self.cancelled = threading.Event()
+        self.stopped = False
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.cancelled.is_set():
+            # raise once to stop the writer; its cleanup (closing a zip,
+            # a sheet) may still write, and that output goes nowhere
+            if self.stopped:
+                return len(data)
+            self.stopped = True
+            raise StreamCancelled()
+        self.buffer += data
+        while len(self.buffer) >= self.chunk_bytes:
+            self._put(bytes(self.buffer[:self.chunk_bytes]))
+            del self.buffer[:self.chunk_bytes]
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def _put(self, item):
+        while not self.cancelled.is_set():
+            try:
+                self.queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+        raise StreamCancelled()
+
+    def finish(self, error=None):
+        if self.buffer and error is None:
+            self._put(bytes(self.buffer))
+        self.buffer.clear()
+        self._put(error if error is not None else _DONE)
+
+    def chunks(self):
+        try:
+            while True:
+                item = self.queue.get()
+                if item is _DONE:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # client gone (or done) — stop the writer at its next write
+            self.cancelled.set()
+
+
+def stream_written(write, mimetype, download_name, headers=None):
+    # write(out) runs in a thread and writes the file to `out`; the
+    # response sends each chunk as soon as it is full. Writers that emit
+    # as they go (xlsx_stream, course_pack) get their first bytes out while
+    # the rest is still being built; an openpyxl save() only bounds memory.
+    # The knowledge-base version is pinned in the writer as for stream_records.
+    pipe = ChunkPipe()
+    snap = KB.snapshot()
+
+    def run():
+        token = KB.pin(snap)
+        try:
+            write(pipe)
+        except StreamCancelled:
+            return
+        except Exception as e:
+            try:
+                pipe.finish(e)
+            except StreamCancelled:
+                pass
+            return
+        finally:
+            KB.unpin(token)
+        try:
+            pipe.finish()
+        except StreamCancelled:
+            pass
+
+    def body():
+        # started on first read, so a response that is never sent never
+        # leaves a writer blocked on the queue
+        threading.Thread(target=run, name="stream-writer", daemon=True).start()
+        # empty first chunk: the server sends status and headers now, not
+        # when the writer has produced its first full chunk
+        yield b""
+        yield from pipe.chunks()
+
+    response = Response(body(), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{download_name}"'
+    response.headers["Cache-Control"] = "no-store"
+    response.headers["X-Accel-Buffering"] = "no"
+    for name, value in (headers or {}).items():
+        response.headers[name] = value
+    return response
@@ -0,0 +1,61 @@
+# ======================================================
+# SCLOG — BLOOM TAXONOMY RULES (shared by app.py and server.py)
+# ======================================================
+
+# ======================================================
+# DEGREE × DOMAIN × BLOOM LIMIT
+# ======================================================
+DEGREE_BLOOM_LIMIT = {
+    "cognitive": {
+        "Diploma": ["remember", "understand", "apply"],
+        "Degree": ["apply", "analyze", "analyse", "evaluate"],
+        "Master": ["analyze", "analyse", "evaluate", "create"],
+        "PhD": ["evaluate", "create"]
+    },
+    "affective": {
+    "Diploma": ["receiving", "responding"],
+    "Degree": ["responding", "valuing"],
+    "Master": ["valuing", "organization"],
+    "PhD": ["organization", "characterization"]
+    },
+    "psychomotor": {
+        "Diploma": ["perception", "set", "guided response"],
+        "Degree": ["guided response", "mechanism"],
+        "Master": ["complex overt response", "adaptation"],
+        "PhD": ["adaptation", "origination"]
+    }
+}
+
+# ======================================================
+# BLOOM DESCRIPTIONS (UI EXPLANATION)
+# ======================================================
+BLOOM_DESCRIPTIONS = {
+    "cognitive": {
+        "remember": "Recall relevant knowledge from long-term memory.",
+        "understand": "Construct meaning from instructional messages.",
+        "apply": "Use procedures to perform tasks or solve problems.",
+        "analyze": "Break material into parts and determine relationships.",
+        "evaluate": "Make judgments based on criteria and standards.",
+        "create": "Put elements together to form a novel structure."
+    },
+    "affective": {
+        "receiving": "Willingness to listen and be aware of values.",
+        "responding": "Active participation through response or compliance.",
+        "valuing": "Attach worth or value to behaviours or ideas.",
+        "organization": "Integrate values into a coherent system.",
+        "characterization": "Consistent value-driven behaviour."
+    },
+    "psychomotor": {
+        "perception": "Use sensory cues to guide motor activity.",
+        "set": "Readiness to act based on mental and physical disposition.",
+        "guided response": "Early stage of skill acquisition with guidance.",
+        "mechanism": "Intermediate stage of skill proficiency.",
+        "complex overt response": "Skilled performance of complex movements.",
+        "adaptation": "Modify movements to fit special situations.",
+        "origination": "Create new movement patterns."
+    }
+}
+
+
+def allowed_blooms(domain, level):
+    return [b.lower() for b in DEGREE_BLOOM_LIMIT.get(domain, {}).get(level, [])]
@@ -0,0 +1,169 @@
+# ======================================================
+# SCLOG — STREAMED XLSX (SHEET XML STRAIGHT INTO THE ZIP)
+# ======================================================
+#
+# openpyxl's write-only mode keeps every sheet in a temp file and writes
+# nothing to `out` until save(). Here each row's XML goes into its sheet's
+# ZIP member as it is appended, deflated on the way, so an unseekable
+# `out` (streaming.stream_written) receives the workbook from the first
+# rows on. Strings are written inline — there is no shared-string table
+# to finish first — and workbook.xml, the relationships and the content
+# types go last, once every sheet title is known. One sheet is open at a
+# time, as with openpyxl's write-only sheets.
+
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+SHEET_FLUSH_BYTES = 16 * 1024
+
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+PKG_REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# XML 1.0 has no place for these; openpyxl refuses them, here they are dropped
+ILLEGAL_XML_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+CELL_MAX_CHARS = 32767
+
+STYLES_XML = (
+    f'{XML_HEADER}<styleSheet xmlns="{MAIN_NS}">'
+    '<fonts count="1"><font><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+    '<fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+    '</styleSheet>'
+)
+
+
+def column_letter(index):
+    # 1 → A, 27 → AA
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def cell_xml(ref, value):
+    if value is None or value == "":
+        return ""
+    if isinstance(value, bool):
+        return f'<c r="{ref}" t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)) and value == value and abs(value) != float("inf"):
+        return f'<c r="{ref}"><v>{value!r}</v></c>'
+    text = escape(ILLEGAL_XML_RE.sub("", str(value))[:CELL_MAX_CHARS])
+    return f'<c r="{ref}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class StreamingSheet:
+    def __init__(self, raw, title):
+        self.raw = raw
+        self.title = title
+        self.rows = 0
+        self.columns = []           # column letters, grown as rows widen
+        self.pending = []
+        self.pending_bytes = 0
+        self.closed = False
+        self._write(f'{XML_HEADER}<worksheet xmlns="{MAIN_NS}"><sheetData>')
+
+    def _write(self, text):
+        self.pending.append(text)
+        self.pending_bytes += len(text)
+        if self.pending_bytes >= SHEET_FLUSH_BYTES:
+            self._flush()
+
+    def _flush(self):
+        if self.pending:
+            self.raw.write("".join(self.pending).encode("utf-8"))
+            self.pending.clear()
+            self.pending_bytes = 0
+
+    def append(self, row):
+        if self.closed:
+            raise ValueError(f"Sheet '{self.title}' is closed")
+        self.rows += 1
+        row = list(row)
+        while len(self.columns) < len(row):
+            self.columns.append(column_letter(len(self.columns) + 1))
+        cells = "".join(
+            cell_xml(f"{self.columns[i]}{self.rows}", value) for i, value in enumerate(row)
+        )
+        self._write(f'<row r="{self.rows}">{cells}</row>')
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self._write("</sheetData></worksheet>")
+            self._flush()
+        finally:
+            self.raw.close()
+
+
+class StreamingWorkbook:
+    def __init__(self, out, compresslevel=6):
+        self.zf = zipfile.ZipFile(out, "w", compression=zipfile.ZIP_DEFLATED,
+                                  compresslevel=compresslevel)
+        self.sheets = []
+
+    def create_sheet(self, title):
+        if self.sheets and not self.sheets[-1].closed:
+            raise ValueError(f"Close sheet '{self.sheets[-1].title}' before opening another")
+        number = len(self.sheets) + 1
+        sheet = StreamingSheet(self.zf.open(f"xl/worksheets/sheet{number}.xml", "w"), title)
+        self.sheets.append(sheet)
+        return sheet
+
+    def close(self):
+        # the package parts that name every sheet, then the central directory
+        if not self.sheets:
+            self.create_sheet("Sheet")
+        self.sheets[-1].close()
+
+        sheets = "".join(
+            f'<sheet name="{escape(s.title, {chr(34): "&quot;"})}" sheetId="{i}" r:id="rId{i}"/>'
+            for i, s in enumerate(self.sheets, start=1)
+        )
+        self.zf.writestr("xl/workbook.xml", (
+            f'{XML_HEADER}<workbook xmlns="{MAIN_NS}" xmlns:r="{REL_NS}">'
+            f'<sheets>{sheets}</sheets></workbook>'
+        ))
+
+        rels = "".join(
+            f'<Relationship Id="rId{i}" Type="{REL_NS}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(self.sheets) + 1)
+        )
+        styles_id = len(self.sheets) + 1
+        self.zf.writestr("xl/_rels/workbook.xml.rels", (
+            f'{XML_HEADER}<Relationships xmlns="{PKG_REL_NS}">{rels}'
+            f'<Relationship Id="rId{styles_id}" Type="{REL_NS}/styles" Target="styles.xml"/>'
+            '</Relationships>'
+        ))
+        self.zf.writestr("xl/styles.xml", STYLES_XML)
+        self.zf.writestr("_rels/.rels", (
+            f'{XML_HEADER}<Relationships xmlns="{PKG_REL_NS}">'
+            f'<Relationship Id="rId1" Type="{REL_NS}/officeDocument" Target="xl/workbook.xml"/>'
+            '</Relationships>'
+        ))
+
+        content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml"
+        overrides = "".join(
+            f'<Override PartName="/xl/worksheets/sheet{i}.xml"'
+            f' ContentType="{content_type}.worksheet+xml"/>'
+            for i in range(1, len(self.sheets) + 1)
+        )
+        self.zf.writestr("[Content_Types].xml", (
+            f'{XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels"'
+            ' ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            f'<Override PartName="/xl/workbook.xml" ContentType="{content_type}.sheet.main+xml"/>'
+            f'<Override PartName="/xl/styles.xml" ContentType="{content_type}.styles+xml"/>'
+            f'{overrides}</Types>'
+        ))
+        self.zf.close()